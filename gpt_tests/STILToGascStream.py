@@ -102,6 +102,8 @@ class STILToGascStream(STILEventHandler):
         self.timings: Dict[str, List] = {}  # Timing 数据
         self.used_signals: List[str] = []   # Pattern 使用的信号列表
         self.signal_count = 0
+        # 全 X 向量（信号数确定后生成一次，补齐和微指令行共用）
+        self.x_pad = ""
         
         # 上一行每个信号/信号组的 WFC 值，用于补充缺少的信号值
         # key: 信号/信号组名, value: WFC 字符串
@@ -177,7 +179,7 @@ class STILToGascStream(STILEventHandler):
         
         # 如果向量长度小于信号数，补充 X
         if len(vec) < self.signal_count:
-            vec += "X" * (self.signal_count - len(vec))
+            vec += self.x_pad[len(vec):]
         
         # 转换向量字符（子类可覆盖）
         vec = self.transform_vec_char(vec)
@@ -202,12 +204,12 @@ class STILToGascStream(STILEventHandler):
         """Call 指令 - 已在解析器中展开"""
         if not proc_content:
             # Procedure 未找到，输出 Call 指令
-            vec = "X" * self.signal_count
+            vec = self.x_pad
             self.on_vector(vec, f"Call {proc_name}", "")
     
     def on_micro_instruction(self, label: str, instr: str, param: str = "", vector_address: int = 0) -> None:
         """其他微指令（Stop, Goto 等）"""
-        vec = "X" * self.signal_count
+        vec = self.x_pad
         # 映射指令
         mapped_instr = map_instruction(instr)
         formatted_instr = f"{mapped_instr} {param}".strip() if param else mapped_instr
@@ -297,6 +299,7 @@ class STILToGascStream(STILEventHandler):
             self.pat_header = self.pattern_parser.get_pat_header()
             self.timings = self.pattern_parser.get_timings()
             self.signal_count = len(self.used_signals)
+            self.x_pad = "X" * self.signal_count
             
             if self.progress_callback:
                 self.progress_callback(f"Pattern uses {self.signal_count} signals")
@@ -305,35 +308,40 @@ class STILToGascStream(STILEventHandler):
             if not self.output_file:
                 raise Exception("输出文件流未初始化")
             
+            # 头部各段先拼接在列表里，最后一次写出
+            parts: List[str] = []
+            
             # 写入 Header（Pattern 使用的信号顺序）
-            self.output_file.write("HEADER {\n")
-            self.output_file.write("     " + ",".join(self.used_signals) + ";\n")
-            self.output_file.write("}\n\n")
+            parts.append("HEADER {\n")
+            parts.append("     " + ",".join(self.used_signals) + ";\n")
+            parts.append("}\n\n")
             
             # 写入 Signals
-            self.output_file.write("Signals {\n")
-            self.output_file.write("     " + ",".join(self.signals.keys()) + ";\n")
-            self.output_file.write("}\n\n")
+            parts.append("Signals {\n")
+            parts.append("     " + ",".join(self.signals.keys()) + ";\n")
+            parts.append("}\n\n")
             
             # 写入 Signal Groups
             if self.signal_groups:
-                self.output_file.write("SignalGroups {\n")
+                parts.append("SignalGroups {\n")
                 for name, sigs in self.signal_groups.items():
-                    self.output_file.write("     {} = '{}';\n".format(name, " + ".join(sigs)))
-                self.output_file.write("}\n\n")
+                    parts.append("     {} = '{}';\n".format(name, " + ".join(sigs)))
+                parts.append("}\n\n")
             
             # 写入 Timing
             if self.timings:
-                self.output_file.write("Timing {\n")
+                parts.append("Timing {\n")
                 for key, timing_list in self.timings.items():
                     for td in timing_list:
-                        self.output_file.write(f"     {td.wft}, {td.period}, ")
-                        self.output_file.write(f"{td.signal}, {td.wfc}, ")
-                        self.output_file.write(f"{td.t1}, {td.e1}, ")
-                        self.output_file.write(f"{td.t2}, {td.e2}, ")
-                        self.output_file.write(f"{td.t3}, {td.e3}, ")
-                        self.output_file.write(f"{td.t4}, {td.e4};\n")
-                self.output_file.write("}\n\n")
+                        parts.append(f"     {td.wft}, {td.period}, "
+                                     f"{td.signal}, {td.wfc}, "
+                                     f"{td.t1}, {td.e1}, "
+                                     f"{td.t2}, {td.e2}, "
+                                     f"{td.t3}, {td.e3}, "
+                                     f"{td.t4}, {td.e4};\n")
+                parts.append("}\n\n")
+            
+            self.output_file.write("".join(parts))
             
             if self.progress_callback:
                 self.progress_callback("Signals/Timing done...")
@@ -11,8 +11,14 @@ The VCT format requires:
 
 from __future__ import annotations
 
+import gzip
+import io
+import itertools
 import os
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Optional, Callable, Tuple
 
 # 添加父目录到路径
@@ -36,17 +42,205 @@ except ImportError:
     from Semi_ATE.STIL.parsers.STILParser import STILParser
 
 
+# Vector 部分输出缓存的写出阈值（字节）
+_SINK_LIMIT = 1 << 20
+
+# 写线程队列中最多积压的数据块个数
+_WRITE_QUEUE_SIZE = 16
+
+# 目标文件以该后缀结尾时输出 gzip 压缩的 VCT
+_GZIP_SUFFIX = ".gz"
+
+# Vector 部分的起止标记
+_VEC_HDR = b"#VECTOR\n"
+_VEC_END = b"#VECTOREND\n"
+
+# 未定义替换的信号使用的恒等 WFC 查找表
+_IDENTITY_LUT = bytes(range(256))
+
+# Vector 行模板（字节）: "  INSTR         % MR GTE RESERVED         SYN T C  CHANNELS ; 0xADDR\n"
+_VEC_LINE_FMT = b"  %s%s%s ; 0x%06X\n"
+
+# 全部为 "." 的通道数据
+_BLANK_CHANNELS = b"." * 256
+
+# 只有微指令的 Vector 行模板（字节），%s 之后为 标志位区 + 全 "." 通道数据
+_MICRO_LINE_FMT = b"  %s%s ; 0x%06X\n"
+
+
+def _make_fd_writer(fd: int) -> Callable[[bytes], None]:
+    """返回直接用 os.write 写文件描述符的写函数（处理部分写入）"""
+    def write(chunk: bytes) -> None:
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(fd, view):]
+    return write
+
+
+class _TextTarget:
+    """把文本模式的输出对象（如 StringIO）包装成接收 bytes 的对象，按 UTF-8 解码后写入
+    
+    缓存和写线程交出的数据块都以整行为单位，不会截断多字节字符。
+    """
+    
+    __slots__ = ("_f",)
+    
+    def __init__(self, f: io.TextIOBase):
+        self._f = f
+    
+    def write(self, data: bytes) -> int:
+        return self._f.write(data.decode('utf-8'))
+    
+    def writelines(self, lines) -> None:
+        for line in lines:
+            self.write(line)
+
+
+def _as_binary_target(f):
+    """文本模式的输出对象包装成接收 bytes 的对象，其他对象原样返回"""
+    return _TextTarget(f) if isinstance(f, io.TextIOBase) else f
+
+
+# 通道号标尺：0-255 的百位、十位、个位（不足位数的用空格）
+_CHANNEL_RULER = (
+    "".join(str(i // 100) if i >= 100 else " " for i in range(256)),
+    "".join(str((i // 10) % 10) if i >= 10 else " " for i in range(256)),
+    "".join(str(i % 10) for i in range(256)),
+)
+
+# (instr, param) 的种类远少于向量行数，微指令区的格式化结果直接缓存
+_fmt_instr = lru_cache(maxsize=4096)(format_vct_instruction)
+
+
+@lru_cache(maxsize=4096)
+def _fmt_instr_bytes(instr: str, param: str) -> bytes:
+    """微指令区的字节形式（缓存），用于直接拼接字节行"""
+    return _fmt_instr(instr, param).encode('utf-8')
+
+
+# 填充计划：(组内统一替换表或 None, ((wfc 下标, 替换表, 通道元组), ...), 切片段或 None, 切片段需要的 wfc 长度)
+# 切片段为 ((wfc起, wfc止, wfc步长, 通道起, 通道止, 通道步长), ...)
+_FillRuns = Tuple[Tuple[int, int, int, int, int, int], ...]
+_FillPlan = Tuple[Optional[bytes], Tuple[Tuple[int, bytes, Tuple[int, ...]], ...], Optional[_FillRuns], int]
+
+
+def _build_fill_runs(entries: List[Tuple[int, bytes, Tuple[int, ...]]]) -> Optional[_FillRuns]:
+    """把 (wfc 下标 -> 通道) 的对应关系压缩成等差切片段
+
+    每个信号的第 k 个通道归为第 k 层，每层内 wfc 下标和通道号同时等差递增的连续条目合并为一段，
+    填充时一段只需要一次切片赋值。有通道被多个信号共用时，切片的写入顺序与逐个写入不同，返回 None。
+    """
+    all_channels = [channel for _, _, channels in entries for channel in channels]
+    if len(set(all_channels)) != len(all_channels):
+        return None
+    runs = []
+    depth = max(len(channels) for _, _, channels in entries)
+    for k in range(depth):
+        pairs = [(idx, channels[k]) for idx, _, channels in entries if len(channels) > k]
+        start = 0
+        while start < len(pairs):
+            i0, c0 = pairs[start]
+            end = start + 1
+            if end < len(pairs):
+                i_step = pairs[end][0] - i0
+                c_step = pairs[end][1] - c0
+                if c_step > 0:
+                    while (end < len(pairs) and pairs[end][0] - pairs[end - 1][0] == i_step
+                           and pairs[end][1] - pairs[end - 1][1] == c_step):
+                        end += 1
+                else:
+                    i_step = c_step = 1
+            else:
+                i_step = c_step = 1
+            i_last, c_last = pairs[end - 1]
+            runs.append((i0, i_last + 1, i_step, c0, c_last + 1, c_step))
+            start = end
+    return tuple(runs)
+
+
+def _build_fill_plan(signals: List[str], luts: Dict[str, bytes],
+                     channel_index: Dict[str, Tuple[int, ...]]) -> _FillPlan:
+    """为一个 pat_key 预先展开填充计划
+
+    只保留有有效通道的信号，按 wfc 下标升序排列；
+    组内所有信号使用同一张替换表时记下该表，填充时整串 translate 一次即可，
+    并进一步压缩成切片段，用切片赋值代替逐通道写入。
+
+    Args:
+        signals: 该 pat_key 对应的信号列表
+        luts: 当前波形表下 {信号名: 256字节替换表}
+        channel_index: 信号到有效通道（0-255）的映射，未映射的信号不在其中
+
+    Returns:
+        (group_lut, entries, runs, runs_need)
+    """
+    entries = []
+    for idx, signal in enumerate(signals):
+        channels = channel_index.get(signal)
+        if channels:
+            entries.append((idx, luts.get(signal, _IDENTITY_LUT), channels))
+    group_lut = entries[0][1] if entries else _IDENTITY_LUT
+    for _, lut, _ in entries:
+        if lut is not group_lut and lut != group_lut:
+            group_lut = None
+            break
+    runs = _build_fill_runs(entries) if entries and group_lut is not None else None
+    runs_need = entries[-1][0] + 1 if entries else 0
+    return group_lut, tuple(entries), runs, runs_need
+
+
+def _fill_row(channel_row: bytearray, wfc: bytes, plan: _FillPlan) -> None:
+    """Vector 生成内核：按填充计划把一个 V 块条目的 WFC 写入通道行
+
+    只操作 bytes/bytearray，不涉及 str 拼接、dict 查找和 tuple 哈希。
+
+    Args:
+        channel_row: 256 字节的通道行（原地修改）
+        wfc: 该条目的 WFC 字节串，第 i 个字节对应 signals[i]
+        plan: _build_fill_plan 生成的填充计划
+    """
+    group_lut, entries, runs, runs_need = plan
+    n = len(wfc)
+    if group_lut is None:
+        for idx, lut, channels in entries:
+            if idx >= n:
+                break
+            code = lut[wfc[idx]]
+            for channel in channels:
+                channel_row[channel] = code
+        return
+    if group_lut is not _IDENTITY_LUT:
+        wfc = wfc.translate(group_lut)
+    if runs is not None and n >= runs_need:
+        for i0, i1, i_step, c0, c1, c_step in runs:
+            channel_row[c0:c1:c_step] = wfc[i0:i1:i_step]
+        return
+    for idx, _, channels in entries:
+        if idx >= n:
+            break
+        code = wfc[idx]
+        for channel in channels:
+            channel_row[channel] = code
+
+
 class STILToVCTStream(STILEventHandler):
     """Convert STIL files to VCT format - supports multiple DUTs with channel mapping."""
 
     def __init__(self, stil_file: str, target_file: str = "", 
-                 progress_callback: Optional[Callable[[str], None]] = None, debug: bool = False):
-        """初始化VCT转换器"""
+                 progress_callback: Optional[Callable[[str], None]] = None, debug: bool = False,
+                 memoize_rows: bool = False):
+        """初始化VCT转换器
+        
+        Args:
+            memoize_rows: 连续向量的 WFC 数据完全相同时跳过通道填充，
+                适合大量重复向量的 STIL；向量各不相同时只会多一次比较，默认关闭
+        """
         self.stil_file = stil_file
         self.target_file = target_file
         self.file_size = -1
         self.progress_callback = progress_callback
         self.debug = debug
+        self.memoize_rows = memoize_rows
         self.current_time = datetime.now()
 
         # 解析结果存储
@@ -54,16 +248,35 @@ class STILToVCTStream(STILEventHandler):
         self.signal_groups: Dict[str, List[str]] = {}
         # Timing数据
         self.timings: Dict[str, List[TimingData]] = {}
+        # 按列存放的 Timing 字段 {wft: (signals, wfcs, replacements)}，读取 timings 时同步构建
+        self._timing_soa: Dict[str, Tuple[List[str], List[str], List[str]]] = {}
         
         # 用户配置的信号到通道映射
         self.signal_to_channels: Dict[str, List[int]] = {}
 
         # Vector生成相关
         self.current_wft: str = ""           # 当前波形表名
+        self._current_rradr: int = 0         # 当前波形表的 RRADR（波形表切换时更新）
         self.wft_pending: bool = False       # 波形表是否刚切换
-        self.wfc_replacement_map: Dict[Tuple[str, str, str], str] = {}  # WFC替换映射 {(wft, signal, wfc): replacement}
-        self.output_file = None              # 输出文件句柄（在 generate_vct_vector_section 时设置）
-        self.last_channel_data: List[str] = ["."] * 256  # 上一行的通道数据，用于补充缺少的信号值
+        self.wfc_replacement_map: Dict[str, Dict[str, bytes]] = {}  # WFC替换查找表 {wft: {signal: 256字节替换表}}
+        self._channel_index: Dict[str, Tuple[int, ...]] = {}  # {信号名: 有效通道元组}，生成 Vector 前构建
+        self._pat_key_signals: Dict[str, List[str]] = {}  # {pat_key: 信号列表}，生成 Vector 前构建
+        self.output_file = None              # 输出文件句柄（二进制，仅在 generate_vct_vector_section 期间设置）
+        self._sink: bytearray = bytearray()  # 待写出的 Vector 部分输出缓存
+        self._write_queue: Optional[queue.Queue] = None  # 交给写线程的数据块队列
+        self._flag_fields: Dict[int, str] = {}  # 标志位区缓存 {rradr: 标志位区字符串}
+        self._blank_tails: Dict[int, bytes] = {}  # 只有微指令的行的固定部分 {rradr: 标志位区 + 全 "." 通道数据}
+        # 单槽缓存：连续向量通常使用同一个波形表，只记住最近一次的参数和结果
+        self._flag_key: Optional[int] = None
+        self._next_progress_at: int = 2000  # 下一次汇报进度时的向量数
+        self._last_row_key: Optional[tuple] = None  # 上一行的 (波形表, [(pat_key, wfc), ...])，memoize_rows 时使用
+        self._flag_value: bytes = b""
+        self._luts_key: Optional[str] = None
+        self._luts_value: Dict[str, bytes] = {}
+        # 每个波形表下 {pat_key: 填充计划}，按需填充
+        self._fill_plans: Dict[str, Dict[str, _FillPlan]] = {}
+        self._fill_plans_value: Dict[str, _FillPlan] = {}
+        self.last_channel_data: bytearray = bytearray(b"." * 256)  # 上一行的通道数据，用于补充缺少的信号值
         
         # 通用解析工具
         self.parser_utils = STILParserUtils(debug=debug)
@@ -76,11 +289,8 @@ class STILToVCTStream(STILEventHandler):
         # 停止标志
         self._stop_requested = False
 
-    def __del__(self):
-        """析构时确保关闭文件流"""
-        self.close()
-
     def close(self):
+        """关闭仍然持有的输出文件（正常情况下文件由 convert() 负责关闭）"""
         if self.output_file and not self.output_file.closed:
             self.output_file.close()
 
@@ -97,6 +307,12 @@ class STILToVCTStream(STILEventHandler):
         self.signal_groups = self.pattern_parser0.get_signal_groups()
 
         self.timings = self.pattern_parser0.get_timings()
+        self._timing_soa = {
+            wft_name: ([td.signal for td in timing_list],
+                       [td.wfc for td in timing_list],
+                       [td.vector_replacement for td in timing_list])
+            for wft_name, timing_list in self.timings.items()
+        }
         return used_signals
 
     def set_channel_mapping(self, mapping: Dict[str, List[int]]) -> None:
@@ -109,22 +325,36 @@ class STILToVCTStream(STILEventHandler):
             return []
         
         channels = []
-        parts = channel_str.split(',')
+        out_of_range = []
+        invalid = []
         
-        for part in parts:
+        for part in channel_str.split(','):
             part = part.strip()
-            if part:
+            if not part:
+                continue
+            # 常见情况是纯数字，直接转换，不走异常分支
+            # 用 isdecimal 而不是 isdigit："²"、"①" 的 isdigit 为真，但 int 不接受
+            if part.isdecimal():
+                channel = int(part)
+            else:
                 try:
                     channel = int(part)
-                    if 0 <= channel <= 255:
-                        channels.append(channel)
-                    else:
-                        if self.progress_callback:
-                            self.progress_callback(f"Warning: Channel {channel} out of range (0-255)")
                 except ValueError:
-                    Logger.warning(f"Warning: '{part}' is not a valid number")
-                    if self.progress_callback:
-                        self.progress_callback(f"Warning: '{part}' is not a valid number")
+                    invalid.append(part)
+                    continue
+            if 0 <= channel <= 255:
+                channels.append(channel)
+            else:
+                out_of_range.append(channel)
+        
+        # 警告汇总后只提示一次
+        if out_of_range and self.progress_callback:
+            self.progress_callback(f"Warning: Channel {', '.join(map(str, out_of_range))} out of range (0-255)")
+        if invalid:
+            names = ", ".join(f"'{part}'" for part in invalid)
+            Logger.warning(f"Warning: {names} is not a valid number")
+            if self.progress_callback:
+                self.progress_callback(f"Warning: {names} is not a valid number")
         
         return channels
 
@@ -183,7 +413,8 @@ class STILToVCTStream(STILEventHandler):
                     unmapped_signals.append(signal)
             
             # 检查旧映射中哪些信号不再存在
-            removed_signals = [sig for sig in old_mapping.keys() if sig not in new_signals]
+            new_signal_set = set(new_signals)
+            removed_signals = [sig for sig in old_mapping if sig not in new_signal_set]
             
             # 更新转换器的映射
             self.signal_to_channels = new_mapping
@@ -206,7 +437,7 @@ class STILToVCTStream(STILEventHandler):
     
     def map_instruction(self, stil_instr: str, param: str = "") -> str:
         """映射并格式化微指令"""
-        return format_vct_instruction(stil_instr, param)
+        return _fmt_instr(stil_instr, param)
 
     # ========================== VCT文件生成 ==========================
     
@@ -289,7 +520,10 @@ class STILToVCTStream(STILEventHandler):
             return
         
         # 生成 .rex 文件路径
-        rex_file = os.path.splitext(self.target_file)[0] + ".rex"
+        target_file = self.target_file
+        if target_file.endswith(_GZIP_SUFFIX):
+            target_file = target_file[:-len(_GZIP_SUFFIX)]
+        rex_file = os.path.splitext(target_file)[0] + ".rex"
         
         # 确保 Timing 已格式化（这会填充 wft_to_rradr）
         self.timing_formatter.set_signal_groups(self.signal_groups)
@@ -303,7 +537,7 @@ class STILToVCTStream(STILEventHandler):
             return
         
         try:
-            with open(rex_file, 'w', encoding='utf-8') as f:
+            with open(rex_file, 'w', encoding='utf-8', newline='') as f:
                 # 写入 REX 参数（VRH, VRL, VIH）
                 # rex_params = getattr(self, 'rex_params', {})
                 # vrh = rex_params.get('VRH', '3.3')
@@ -375,37 +609,57 @@ class STILToVCTStream(STILEventHandler):
     
     # ========================== Vector部分生成 ==========================
     
-    def _build_wfc_replacement_map(self) -> Dict[Tuple[str, str, str], str]:
-        """构建 WFC 替换映射表
+    def _build_wfc_replacement_map(self) -> Dict[str, Dict[str, bytes]]:
+        """构建 WFC 替换查找表
         
         Returns:
-            {(wft, signal, wfc): replacement_char} 映射
+            {wft: {signal: lut}} 映射，lut 为 256 字节的替换表，lut[ord(wfc)] 为替换后的字符
             - 如果 TimingData.vector_replacement 不为空，使用它
             - 否则使用原始 wfc
         """
-        replacement_map: Dict[Tuple[str, str, str], str] = {}
+        tables: Dict[str, Dict[str, bytearray]] = {}
+        signal_groups = self.signal_groups
         
-        for wft_name, timing_list in self.timings.items():
-            for td in timing_list:
-                signalOrgroup = td.signal
-                wfc = td.wfc
-                
+        for wft_name, (td_signals, td_wfcs, td_replacements) in self._timing_soa.items():
+            wft_tables = tables.setdefault(wft_name, {})
+            for signalOrgroup, wfc, vector_replacement in zip(td_signals, td_wfcs, td_replacements):
                 if not signalOrgroup or not wfc:
                     continue
                 # 如果信号名字是信号组，就从信号组中获取所有信号
-                if signalOrgroup in self.signal_groups:
-                    signals = self.signal_groups[signalOrgroup]
-                else:
+                signals = signal_groups.get(signalOrgroup)
+                if signals is None:
                     signals = [signalOrgroup]
                 
                 # 如果有替换字符，使用替换字符；否则使用原始 wfc
+                replacement = vector_replacement or wfc
                 for signal in signals:
-                    if td.vector_replacement:
-                        replacement_map[(wft_name, signal, wfc)] = td.vector_replacement
-                    else:
-                        replacement_map[(wft_name, signal, wfc)] = wfc
+                    lut = wft_tables.get(signal)
+                    if lut is None:
+                        lut = wft_tables[signal] = bytearray(_IDENTITY_LUT)
+                    lut[ord(wfc)] = ord(replacement)
+        
+        return {wft_name: {signal: bytes(lut) for signal, lut in wft_tables.items()}
+                for wft_name, wft_tables in tables.items()}
+    
+    def _build_channel_index(self) -> Dict[str, Tuple[int, ...]]:
+        """构建 Vector 生成用的通道索引
         
-        return replacement_map
+        Returns:
+            {signal: channels} 映射，只保留 0-255 范围内的通道，没有有效通道的信号不放入
+        """
+        index: Dict[str, Tuple[int, ...]] = {}
+        for signal, channels in self.signal_to_channels.items():
+            valid = tuple(ch for ch in channels if 0 <= ch <= 255)
+            if valid:
+                index[signal] = valid
+        return index
+    
+    def _rebuild_pat_key_cache(self) -> None:
+        """预先解析所有 pat_key（信号组名或信号名）对应的信号列表"""
+        pat_key_signals = {signal: [signal] for signal, sig_type in self.signals.items() if sig_type}
+        # 同名时信号组优先
+        pat_key_signals.update((group, signals) for group, signals in self.signal_groups.items() if signals)
+        self._pat_key_signals = pat_key_signals
     
     def _generate_signal_header_lines(self) -> List[str]:
         """生成信号名头部注释（垂直排列）
@@ -420,10 +674,7 @@ class STILToVCTStream(STILEventHandler):
                 channel_to_signal[channel] = signal
         
         # 找出最长信号名长度（决定行数）
-        max_name_len = 0
-        for signal in channel_to_signal.values():
-            if len(signal) > max_name_len:
-                max_name_len = len(signal)
+        max_name_len = max(map(len, channel_to_signal.values()), default=0)
         
         if max_name_len == 0:
             return []
@@ -431,21 +682,9 @@ class STILToVCTStream(STILEventHandler):
         # 前缀：51字符宽度
         prefix = ";" + " " * 50
         
-        lines = []
-        for row in range(max_name_len):
-            line_chars = []
-            for channel in range(256):
-                if channel in channel_to_signal:
-                    signal_name = channel_to_signal[channel]
-                    if row < len(signal_name):
-                        line_chars.append(signal_name[row])
-                    else:
-                        line_chars.append(" ")
-                else:
-                    line_chars.append(" ")
-            lines.append(prefix + "".join(line_chars))
-        
-        return lines
+        # 每个通道一列（信号名补齐到相同长度），zip 转置后每行即为一行注释
+        columns = [channel_to_signal.get(channel, "").ljust(max_name_len) for channel in range(256)]
+        return [prefix + "".join(row) for row in zip(*columns)]
     
     def _generate_title_lines(self) -> List[str]:
         """生成标题行和通道号标尺
@@ -454,13 +693,7 @@ class STILToVCTStream(STILEventHandler):
             标题行列表
         """
         # 通道号：百位、十位、个位
-        hundreds = ""
-        tens = ""
-        ones = ""
-        for i in range(256):
-            hundreds += str(i // 100) if i >= 100 else " "
-            tens += str((i // 10) % 10) if i >= 10 else " "
-            ones += str(i % 10)
+        hundreds, tens, ones = _CHANNEL_RULER
         
         # 前缀51字符宽度
         lines = [
@@ -506,7 +739,50 @@ class STILToVCTStream(STILEventHandler):
         return f"START:\n{line}"
     
     
-    def _format_vector_line(self, vec_data_list: List[Tuple[str, str, str, str, str, int]], rradr: int) -> str:
+    def _get_flag_field(self, rradr: int) -> str:
+        """获取标志位区字符串（按 RRADR 缓存）
+        
+        标志位区位于微指令和通道数据之间，除 TOEN/RRADR 外都是固定值，
+        所以每个波形表只拼接一次，逐行格式化时直接引用。
+        
+        Args:
+            rradr: RRADR 值（0-7）
+            
+        Returns:
+            格式: "% MR GTE RESERVED         SYN T C  "
+        """
+        flags = self._flag_fields.get(rradr)
+        if flags is None:
+            mrst_mcmp = ".."       # MRST + MCMP
+            gtst_tena_tmem = "..0" # GTST + TENA + TMEM
+            reserved = "." * 16   # RESERVED
+            sync = "..."          # SYNC
+            toen = str(rradr)     # TOEN/RRADR
+            cs = "0"              # CS
+            flags = f"% {mrst_mcmp} {gtst_tena_tmem} {reserved} {sync} {toen} {cs}  "
+            self._flag_fields[rradr] = flags
+        return flags
+
+    def _get_flag_bytes(self, rradr: int) -> bytes:
+        """获取字节形式的标志位区（单槽缓存），用于直接拼接字节行"""
+        if rradr == self._flag_key:
+            return self._flag_value
+        flags = self._get_flag_field(rradr).encode('ascii')
+        self._flag_key = rradr
+        self._flag_value = flags
+        return flags
+
+    def _get_wft_luts(self, wft_name: str) -> Dict[str, bytes]:
+        """获取波形表下 {信号名: WFC替换表}（单槽缓存）"""
+        if wft_name is self._luts_key or wft_name == self._luts_key:
+            return self._luts_value
+        luts = self.wfc_replacement_map.get(wft_name, {})
+        self._luts_key = wft_name
+        self._luts_value = luts
+        self._fill_plans_value = self._fill_plans.setdefault(wft_name, {})
+        return luts
+
+    def _format_vector_line(self, vec_data_list: List[Tuple[str, str, str, str, str, int]], rradr: int) -> list:
         """格式化单行 Vector 数据
         
         Args:
@@ -514,15 +790,10 @@ class STILToVCTStream(STILEventHandler):
             rradr: 当前波形表的 RRADR 编号
             
         Returns:
-            格式化后的 Vector 行
+            [label, instr, line]，line 为带换行符的字节行
         """
-        # 标志位区（固定值）
-        mrst_mcmp = ".."       # MRST + MCMP
-        gtst_tena_tmem = "..0" # GTST + TENA + TMEM
-        reserved = "." * 16   # RESERVED
-        sync = "..."          # SYNC
-        toen = str(rradr)     # TOEN/RRADR
-        cs = "0"              # CS (固定1)
+        # 标志位区（按 RRADR 缓存）
+        flags = self._get_flag_bytes(rradr)
         
         # 使用上一行的通道数据作为初始值（自动补充缺少的信号值）
         # 这样当某个 V 块的信号数少于前一个 V 块时，缺少的信号会使用上一行的值
@@ -530,63 +801,55 @@ class STILToVCTStream(STILEventHandler):
         
         label_str = ""
         vector_address = 0
-        micro_instr = ""
+        micro_instr = b""
         instr_str = ""
         
         # 缓存常用变量，减少属性查找
-        signal_groups = self.signal_groups
-        signals_dict = self.signals
-        signal_to_channels = self.signal_to_channels
-        wfc_map = self.wfc_replacement_map
-        current_wft = self.current_wft
+        pat_key_signals = self._pat_key_signals
+        channel_index = self._channel_index
+        luts = self._get_wft_luts(self.current_wft)
+        fill_plans = self._fill_plans_value
+        
+        # 与上一行的波形表和 WFC 数据完全相同时，填充结果不变（填充是幂等的），可以跳过
+        skip_fill = False
+        if self.memoize_rows:
+            row_key = (self.current_wft, [(entry[0], entry[1]) for entry in vec_data_list])
+            skip_fill = row_key == self._last_row_key
+            self._last_row_key = row_key
         
         # 遍历每个 pat_header 项和对应的 WFC
         # 6 元组：(signal, data, instr, param, label, vector_address)
         for pat_key, wfc_str, instr, param, label, vec_addr in vec_data_list:
             # 微指令区（16字符）
             instr_str = instr
-            micro_instr = format_vct_instruction(instr, param)
+            micro_instr = _fmt_instr_bytes(instr, param)
             vector_address = vec_addr
             
-            # 获取该 pat_key 对应的信号列表
-            signals = signal_groups.get(pat_key) or (signals_dict.get(pat_key) and [pat_key])
-            if not signals:
-                continue
+            # 获取该 pat_key 的填充计划（首次出现时由信号列表展开）
+            plan = fill_plans.get(pat_key)
+            if plan is None:
+                signals = pat_key_signals.get(pat_key)
+                if not signals:
+                    continue
+                plan = fill_plans[pat_key] = _build_fill_plan(signals, luts, channel_index)
             
             if label:
                 label_str = label
             
-            # 遍历信号和对应的 WFC 字符
-            wfc_len = len(wfc_str)
-            for idx, signal in enumerate(signals):
-                if idx >= wfc_len:
-                    break
-                wfc_char = wfc_str[idx]
-                
-                # 应用 WFC 替换（使用 get 替代 in + 索引）
-                wfc_char = wfc_map.get((current_wft, signal, wfc_char), wfc_char)
-                
-                # 找到该信号绑定的所有通道，填入 WFC
-                channels = signal_to_channels.get(signal)
-                if channels:
-                    for channel in channels:
-                        channel_data[channel] = wfc_char
-        
-        # 预计算固定部分，减少 f-string 拼接开销
-        # 格式: "  INSTR         % MR GTE RESERVED         SYN T C  CHANNELS ; 0xADDR"
-        channel_str = "".join(channel_data)
+            # 应用 WFC 替换并填入信号绑定的所有通道（组内信号都未映射时计划为空，直接跳过）
+            if plan[1] and not skip_fill:
+                _fill_row(channel_data, wfc_str.encode('ascii', 'replace'), plan)
         
         # Loop 起始行，如果没有 Label 就用 vector_address 生成
         if not label_str and "LI" in instr_str:
             label_str = f"0x{vector_address:06X}"
         
-        # 组装行（前缀51字符）
-        # 格式: "  INSTR         % MR GTE RESERVED         SYN T C  CHANNELS ; 0xADDR"
-        line = f"  {micro_instr}% {mrst_mcmp} {gtst_tena_tmem} {reserved} {sync} {toen} {cs}  {channel_str} ; 0x{vector_address:06X}"
+        # 组装行（前缀51字符），通道行直接以字节拼入，不经过 str
+        line = _VEC_LINE_FMT % (micro_instr, flags, channel_data, vector_address)
         
         return [label_str, instr_str, line]
     
-    def _format_micro_only_line(self, instr: str, param: str, rradr: int = 0, vector_address: int = 0) -> str:
+    def _format_micro_only_line(self, instr: str, param: str, rradr: int = 0, vector_address: int = 0) -> bytes:
         """格式化只有微指令的 Vector 行（无向量数据）
         
         用于 Stop、Goto、Call、Return 等不带 vec_block 的语句
@@ -598,26 +861,15 @@ class STILToVCTStream(STILEventHandler):
             vector_address: 向量地址
             
         Returns:
-            格式化后的 Vector 行（通道数据全为 "."）
+            格式化后的 Vector 字节行（通道数据全为 "."，带换行符）
         """
-        # 微指令区（16字符）
-        micro_instr = format_vct_instruction(instr, param)
-        
-        # 标志位区（固定值）
-        mrst_mcmp = ".."       # MRST + MCMP
-        gtst_tena_tmem = "..0" # GTST + TENA + TMEM
-        reserved = "." * 16   # RESERVED
-        sync = "..."          # SYNC
-        toen = str(rradr)     # TOEN/RRADR
-        cs = "0"              # CS (固定1)
+        # 标志位区和通道数据都是固定的，按 RRADR 缓存拼好的字节串
+        tail = self._blank_tails.get(rradr)
+        if tail is None:
+            tail = self._blank_tails[rradr] = self._get_flag_bytes(rradr) + _BLANK_CHANNELS
         
-        # 通道数据全为 "."
-        channel_str = "." * 256
-        
-        # 组装行
-        line = f"  {micro_instr}% {mrst_mcmp} {gtst_tena_tmem} {reserved} {sync} {toen} {cs}  {channel_str} ; 0x{vector_address:06X}"
-        
-        return line
+        # 组装行，微指令区（16字符）可能被参数撑长，所以不做定长切片替换
+        return _MICRO_LINE_FMT % (_fmt_instr_bytes(instr, param), tail, vector_address)
     
     def _generate_start_lines(self, pattern_burst_name: str) -> List[str]:
         """生成 VCT 起始行（固定内容）
@@ -627,13 +879,8 @@ class STILToVCTStream(STILEventHandler):
         """
         lines = []
         
-        # 标志位区（固定值）
-        mrst_mcmp = ".."       # MRST + MCMP
-        gtst_tena_tmem = "..0" # GTST + TENA + TMEM
-        reserved = "." * 16   # RESERVED
-        sync = "..."          # SYNC
-        toen = "0"            # TOEN/RRADR
-        cs = "0"              # CS
+        # 标志位区（TOEN/RRADR 固定为 0）
+        flags = self._get_flag_field(0)
         
         # 通道数据全为 "."
         channel_str = "." * 256
@@ -655,8 +902,8 @@ class STILToVCTStream(STILEventHandler):
                 lines.append(label)
             
             # 格式化微指令（16字符宽度）
-            micro_instr = format_vct_instruction(instr, param)
-            line = f"  {micro_instr}% {mrst_mcmp} {gtst_tena_tmem} {reserved} {sync} {toen} {cs}  {channel_str}"
+            micro_instr = _fmt_instr(instr, param)
+            line = f"  {micro_instr}{flags}{channel_str}"
             lines.append(line)
         
         return lines
@@ -678,14 +925,15 @@ class STILToVCTStream(STILEventHandler):
         """解析开始时调用"""
         # 写入起始行
         for line in self._generate_start_lines(pattern_burst_name):
-            self.output_file.write(line + "\n")
-        self.output_file.write("\n")
+            self._write_line(line)
+        self._write_line("")
         pass
 
     def on_waveform_change(self, wft_name: str) -> None:
         """波形表切换"""
         self.current_wft = wft_name
         self.wft_pending = True
+        self._current_rradr = self.timing_formatter.wft_to_rradr.get(wft_name, 0)
     
     def on_annotation(self, annotation: str) -> None:
         """注释时调用
@@ -693,11 +941,11 @@ class STILToVCTStream(STILEventHandler):
         Args:
             annotation: 注释内容
         """
-        self.output_file.write(f";{annotation}\n")
+        self._write_line(f";{annotation}")
 
     def on_label(self, label_name: str) -> None:
         """遇到标签"""
-        self.output_file.write(f"{label_name}:\n")
+        self._write_line(f"{label_name}:")
     
     def on_vector(self, vec_data_list: List[Tuple[str, str, str, str, str, int]], 
                   instr: str = "", param: str = "") -> None:
@@ -706,56 +954,67 @@ class STILToVCTStream(STILEventHandler):
         Args:
             vec_data_list: [(signal, data, instr, param, label, vector_address), ...] 列表
         """
-        rradr = self.timing_formatter.wft_to_rradr.get(self.current_wft, 0)
+        rradr = self._current_rradr
         label_str, instr_str, line = self._format_vector_line(vec_data_list, rradr)
-        if "LI" in instr_str or "MBGN" in instr_str:
-            self.output_file.write(line + "\n")
-            if label_str:
-                self.output_file.write(f"{label_str}:\n")
+        write_bytes = self._write_bytes
+        if not label_str:
+            # 绝大多数向量没有标签，不需要判断标签和向量行的先后顺序
+            write_bytes(line)
+        elif "LI" in instr_str or "MBGN" in instr_str:
+            write_bytes(line)
+            write_bytes(f"{label_str}:\n".encode('utf-8'))
         else:
-            if label_str:
-                self.output_file.write(f"{label_str}:\n")
-            self.output_file.write(line + "\n")
+            write_bytes(f"{label_str}:\n".encode('utf-8'))
+            write_bytes(line)
 
         self.wft_pending = False
 
-        # 进度更新
+        # 进度更新（到达下一个汇报点时才进入慢路径）
         vector_count = self.pattern_parser0.state.vector_count
-        read_size = self.pattern_parser0.state.read_size
-        update_interval = 2000 if vector_count <= 10000 else 10000
-        if self.progress_callback and vector_count % update_interval == 0:
+        if vector_count >= self._next_progress_at:
+            self._report_progress(vector_count)
+    
+    def _report_progress(self, vector_count: int) -> None:
+        """汇报向量处理进度，并计算下一个汇报点
+        
+        前 10000 个向量每 2000 个汇报一次，之后每 10000 个汇报一次。
+        """
+        if vector_count < 10000:
+            self._next_progress_at = (vector_count // 2000 + 1) * 2000
+        else:
+            self._next_progress_at = (vector_count // 10000 + 1) * 10000
+        if self.progress_callback:
+            read_size = self.pattern_parser0.state.read_size
             progress = read_size / self.file_size * 100 if self.file_size > 0 else 100
             tt =  datetime.now() - self.current_time
             self.progress_callback(f"Processed {vector_count:,} vectors, {progress:.1f}%...[{tt.total_seconds():.2f}S]")
             self.current_time = datetime.now()
-        if vector_count % 10000 == 0:
-             self.output_file.flush()
     
     def on_procedure_call(self, proc_name: str, proc_content: str = "", vector_address: int = 0) -> None:
         """Call 指令 - 内容已在解析器中展开"""
         # 如果 proc_content 为空，说明 Procedure 未找到或解析失败
         # 需要生成一个普通的 CALL 微指令
         if not proc_content:
-            rradr = self.timing_formatter.wft_to_rradr.get(self.current_wft, 0)
+            rradr = self._current_rradr
             line = self._format_micro_only_line("Call", proc_name, rradr, vector_address)
-            self.output_file.write(line + "\n")
+            self._write_bytes(line)
             if self.progress_callback:
                 self.progress_callback(f"Warning: Procedure '{proc_name}' not found")
     
     def on_micro_instruction(self, label: str, instr: str, param: str = "", vector_address: int = 0) -> None:
         """其他微指令（Stop, Goto, IddqTestPoint 等）"""
-        rradr = self.timing_formatter.wft_to_rradr.get(self.current_wft, 0)
+        rradr = self._current_rradr
         line = self._format_micro_only_line(instr, param, rradr, vector_address)
         self.wft_pending = False
+        write_bytes = self._write_bytes
         if "LI" in instr or "MBGN" in instr:
-            self.output_file.write(line + "\n")
+            write_bytes(line)
             if label:
-                self.output_file.write(f"{label}:\n")
+                write_bytes(f"{label}:\n".encode('utf-8'))
         else:
             if label:
-                self.output_file.write(f"{label}:\n")
-            self.output_file.write(line + "\n")
-        # 移除每次调用都 flush，改为依赖 on_vector 中的定期 flush
+                write_bytes(f"{label}:\n".encode('utf-8'))
+            write_bytes(line)
 
     def on_parse_complete(self, vector_count: int) -> None:
         """解析完成"""
@@ -776,108 +1035,225 @@ class STILToVCTStream(STILEventHandler):
                 self.progress_callback(f"Warning: {error_msg}")
         
     
+    def _write_line(self, line: str) -> None:
+        """追加一行 Vector 部分的输出到缓存，超过阈值后统一写出"""
+        sink = self._sink
+        sink += line.encode('utf-8')
+        sink += b"\n"
+        if len(sink) >= _SINK_LIMIT:
+            self._flush_lines()
+
+    def _write_bytes(self, data: bytes) -> None:
+        """追加已编码、带换行符的输出到缓存，超过阈值后统一写出"""
+        sink = self._sink
+        sink += data
+        if len(sink) >= _SINK_LIMIT:
+            self._flush_lines()
+
+    def _flush_lines(self) -> None:
+        """把缓存的输出交给写线程，换一个新缓存继续填充"""
+        if self._sink:
+            self._write_queue.put(self._sink)
+            self._sink = bytearray()
+
+    @staticmethod
+    def _drain_write_queue(write: Callable[[bytes], None], write_queue: queue.Queue) -> None:
+        """写线程：从队列中取出数据块写入文件，取到 None 时结束
+        
+        写文件时会释放 GIL，因此解析（CPU）和写盘（I/O）可以并行。
+        写入出错后继续取空队列，避免解析线程阻塞在 put 上，最后再抛出异常。
+        """
+        error = None
+        get = write_queue.get
+        while True:
+            chunk = get()
+            if chunk is None:
+                break
+            if error is None:
+                try:
+                    write(chunk)
+                except Exception as e:
+                    error = e
+        if error is not None:
+            raise error
+
     def generate_vct_vector_section(self, output_file) -> int:
         """生成VCT文件Vector部分（第四部分）- 流式写入
         
         Args:
-            output_file: 输出文件句柄
+            output_file: 输出文件句柄（二进制模式；文本模式的对象按 UTF-8 写入）
             
         Returns:
             生成的向量行数
         """
+        output_file = _as_binary_target(output_file)
         # 保存输出文件句柄（供回调使用）
         self.output_file = output_file
+        self._sink = bytearray()
         
         # 初始化
         self.current_wft = ""
         self.wft_pending = False
+        self._current_rradr = self.timing_formatter.wft_to_rradr.get("", 0)
+        self._next_progress_at = 2000
+        self._last_row_key = None
         
         # 构建 WFC 替换映射
         self.wfc_replacement_map = self._build_wfc_replacement_map()
+        self._luts_key = None
+        self._fill_plans = {}
+        self._channel_index = self._build_channel_index()
+        self._rebuild_pat_key_cache()
+        
+        # 写入 #VECTOR 头、信号名头部和标题行（一次 writelines 写出）
+        output_file.writelines(itertools.chain(
+            (_VEC_HDR,),
+            (f"{line}\n".encode('utf-8') for line in itertools.chain(
+                self._generate_signal_header_lines(),
+                self._generate_title_lines()))))
+        
+        raw_fd = None
+        write = output_file.write
+        try:
+            # 普通文件的数据块都是 1MiB 左右，直接在复制出来的文件描述符上 os.write，
+            # 跳过 BufferedWriter；管道等不能 seek 的目标和 gzip 等包装过的文件对象仍然走 write
+            if isinstance(output_file, io.BufferedWriter) and output_file.seekable():
+                output_file.flush()
+                raw_fd = os.dup(output_file.fileno())
+                os.lseek(raw_fd, 0, os.SEEK_END)
+                write = _make_fd_writer(raw_fd)
+            
+            # 解析 Pattern（通过回调写入），写文件交给单独的写线程
+            self._write_queue = queue.Queue(maxsize=_WRITE_QUEUE_SIZE)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                writer = executor.submit(self._drain_write_queue, write, self._write_queue)
+                try:
+                    vector_count = self.pattern_parser0.parse_patterns()
+                    
+                    # 写入结束部分
+                    self._sink += _VEC_END
+                    self._flush_lines()
+                finally:
+                    self._write_queue.put(None)
+                # 等待写线程结束，并抛出写入过程中的异常
+                writer.result()
+        finally:
+            self._write_queue = None
+            self.output_file = None
+            if raw_fd is not None:
+                os.close(raw_fd)
+                # 文件位置已被 os.write 推进，同步到原文件对象
+                output_file.seek(0, os.SEEK_END)
         
-        # 写入 #VECTOR 头
-        output_file.write("#VECTOR\n")
-        
-        # 写入信号名头部
-        for line in self._generate_signal_header_lines():
-            output_file.write(line + "\n")
-        
-        # 写入标题行
-        for line in self._generate_title_lines():
-            output_file.write(line + "\n")
-        
-        # 解析 Pattern（通过回调写入）
-        vector_count = self.pattern_parser0.parse_patterns()
+        return vector_count
+    
+    def _emit_preamble(self, f, cb: Optional[Callable[[str], None]]) -> bool:
+        """写出 Header、Timing 和 DRVR 部分，并生成 .rex 文件
         
-        # 写入结束部分
-        output_file.write("#VECTOREND\n")
+        Args:
+            f: 输出文件句柄（二进制模式；文本模式的对象按 UTF-8 写入）
+            cb: 进度回调，可以为 None
+            
+        Returns:
+            True: 完成, False: 被停止
+        """
+        f = _as_binary_target(f)
+        if self._stop_requested:
+            return False
+        if cb:
+            cb("Writing header...")
+        f.write(self.generate_vct_header().encode('utf-8'))
+        
+        if self._stop_requested:
+            return False
+        if cb:
+            cb("Writing timing defs...")
+        f.write(self.generate_vct_timing_section().encode('utf-8'))
+        
+        # 生成 .rex 文件
+        self.generate_rex_file()
+        
+        if self._stop_requested:
+            return False
+        if cb:
+            cb("Writing DRVR defs...")
+        f.write(self.generate_vct_drvr_section().encode('utf-8'))
+        f.write(b"\n")
+        return True
+
+    def _emit_vectors(self, f, cb: Optional[Callable[[str], None]]) -> int:
+        """写出 Vector 部分
         
+        Args:
+            f: 输出文件句柄（二进制模式）
+            cb: 进度回调，可以为 None
+            
+        Returns:
+            生成的向量行数, -1: 被停止
+        """
+        if self._stop_requested:
+            return -1
+        if cb:
+            cb("Writing vectors...")
+        vector_count = self.generate_vct_vector_section(f)
+        
+        # 检查是否被停止
+        if self._stop_requested:
+            if cb:
+                cb(f"Stopped, {vector_count} vectors processed")
+            return -1
+        if cb:
+            cb(f"Vectors done, {vector_count} total")
         return vector_count
-    
+
     def convert(self) -> int:
         """执行VCT转换
         
+        只有打开和关闭输出文件的 OSError 会被转换成返回值 -1，
+        生成过程中的其他异常会带着完整堆栈直接抛给调用者。
+        
         Returns:
             0: 成功, -1: 失败或被停止
         """
-        if self.progress_callback:
-            self.progress_callback("Generating VCT file...")
-                # 获取文件大小
+        cb = self.progress_callback
+        if cb:
+            cb("Generating VCT file...")
+        # 获取文件大小
         self.file_size = os.path.getsize(self.stil_file) if os.path.exists(self.stil_file) else 0
-        size_mb = self.file_size / (1024 * 1024)
         
         try:
-            with open(self.target_file, 'w', encoding='utf-8') as f:
-                if self._stop_requested:
-                    return -1
-                    
-                if self.progress_callback:
-                    self.progress_callback("Writing header...")
-                f.write(self.generate_vct_header())
-                
-                if self._stop_requested:
-                    return -1
-                    
-                if self.progress_callback:
-                    self.progress_callback("Writing timing defs...")
-                f.write(self.generate_vct_timing_section())
-                
-                # 生成 .rex 文件
-                self.generate_rex_file()
-                
-                if self._stop_requested:
-                    return -1
-                    
-                if self.progress_callback:
-                    self.progress_callback("Writing DRVR defs...")
-                f.write(self.generate_vct_drvr_section())
-                f.write("\n")
-                
-                if self._stop_requested:
-                    return -1
-                    
-                if self.progress_callback:
-                    self.progress_callback("Writing vectors...")
-                vector_count = self.generate_vct_vector_section(f)
-                
-                # 检查是否被停止
-                if self._stop_requested:
-                    if self.progress_callback:
-                        self.progress_callback(f"Stopped, {vector_count} vectors processed")
-                    return -1
-                
-                if self.progress_callback:
-                    self.progress_callback(f"Vectors done, {vector_count} total")
-            
-            if self.progress_callback:
-                self.progress_callback(f"VCT file done: {self.target_file}")
-            
-            return 0
-            
-        except Exception as e:
-            if self.progress_callback:
-                # 堆栈信息也打印到日志里面
-                Logger.error(f"VCT generation failed: {e}", exc_info=True)
-                self.progress_callback(f"VCT generation failed: {e}")
+            # 目标文件以 .gz 结尾时边生成边压缩，VCT 文本压缩率很高，
+            # 压缩等级 1 的 CPU 开销远小于少写的磁盘数据量
+            if self.target_file.endswith(_GZIP_SUFFIX):
+                f = gzip.open(self.target_file, 'wb', compresslevel=1)
+            else:
+                f = open(self.target_file, 'wb')
+        except OSError as e:
+            # 堆栈信息也打印到日志里面
+            Logger.error(f"VCT generation failed: {e}", exc_info=True)
+            if cb:
+                cb(f"VCT generation failed: {e}")
             return -1
+        
+        try:
+            vector_count = self._emit_vectors(f, cb) if self._emit_preamble(f, cb) else -1
+        except BaseException:
+            f.close()
+            raise
+        
+        try:
+            f.close()
+        except OSError as e:
+            Logger.error(f"VCT generation failed: {e}", exc_info=True)
+            if cb:
+                cb(f"VCT generation failed: {e}")
+            return -1
+        
+        if vector_count < 0:
+            return -1
+        
+        if cb:
+            cb(f"VCT file done: {self.target_file}")
+        
+        return 0
 
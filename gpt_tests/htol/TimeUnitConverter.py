@@ -3,25 +3,30 @@
 支持 ps/ns/us/ms/s 之间的相互转换。
 """
 
+from functools import lru_cache
 from typing import Tuple, Optional
 import re
 
+# 时间字符串：数字（可带小数,支持科学计数法）+ 单位，模块加载时编译一次
+# 匹配前先把字符串转成小写，所以单位只列小写形式，也不需要 IGNORECASE
+_TIME_RE = re.compile(r"^([+-]?\d*\.?\d+(?:[eE][+-]?\d+)?)\s*(ps|ns|us|ms|s)?$")
+
+# 快速路径可以直接识别的单位（小写）
+_FAST_UNITS = frozenset(("ps", "ns", "us", "ms", "s"))
+
 
 class TimeUnitConverter:
     """时间单位转换器"""
     
-    # 单位到皮秒(ps)的转换因子
+    __slots__ = ("default_output_unit",)
+    
+    # 单位到皮秒(ps)的转换因子（只有小写形式，其他大小写先转成小写再查）
     UNIT_TO_PS = {
         "ps": 1,
-        "pS": 1,
         "ns": 1000,
-        "nS": 1000,
         "us": 1000000,
-        "uS": 1000000,
         "ms": 1000000000,
-        "mS": 1000000000,
         "s": 1000000000000,
-        "S": 1000000000000,
     }
     
     # 默认输出单位
@@ -51,15 +56,29 @@ class TimeUnitConverter:
             return (0.0, "ns")
         
         time_str = time_str.strip()
+        
+        # 快速路径：无符号的普通小数 + 紧跟的单位（如 "100", "100ns", "1.5us"），不走正则
+        i = len(time_str)
+        while i and time_str[i - 1].isalpha():
+            i -= 1
+        num = time_str[:i]
+        unit = time_str[i:].lower() or "ns"
+        if (unit in _FAST_UNITS and num and num[-1] != "."
+                and num.replace(".", "", 1).isdigit()):
+            try:
+                return (float(num), unit)
+            except ValueError:
+                pass
+        
         # 如果包含/符号，要根据/切分出来两个数字，然后前后相除，
         # 正则匹配：数字（可带小数,支持科学计数法）+ 单位
-        match = re.match(r"^([+-]?\d*\.?\d+(?:[eE][+-]?\d+)?)\s*(ps|ns|us|ms|s|pS|nS|uS|mS|S)?$", time_str, re.IGNORECASE)
+        match = _TIME_RE.match(time_str.lower())
         
         if not match:
             raise ValueError(f"无法解析时间字符串: {time_str}")
         
         value = float(match.group(1))
-        unit = match.group(2).lower() if match.group(2) else "ns"
+        unit = match.group(2) or "ns"
         return (value, unit)
 
         # # 写一个正则匹配 1/数字+单位MHz|KHz|Hz|mHz|uHz|nHz|pHz|fHz
@@ -72,17 +91,23 @@ class TimeUnitConverter:
     
     def to_ps(self, value: float, unit: str) -> float:
         """将任意单位转换为皮秒(ps)"""
-        unit = unit.lower()
-        if unit not in self.UNIT_TO_PS:
-            raise ValueError(f"不支持的单位: {unit}")
-        return value * self.UNIT_TO_PS[unit]
+        factor = self.UNIT_TO_PS.get(unit)
+        if factor is None:
+            unit = unit.lower()
+            factor = self.UNIT_TO_PS.get(unit)
+            if factor is None:
+                raise ValueError(f"不支持的单位: {unit}")
+        return value * factor
     
     def from_ps(self, ps_value: float, target_unit: str) -> float:
         """将皮秒转换为目标单位"""
-        target_unit = target_unit.lower()
-        if target_unit not in self.UNIT_TO_PS:
-            raise ValueError(f"不支持的单位: {target_unit}")
-        return ps_value / self.UNIT_TO_PS[target_unit]
+        factor = self.UNIT_TO_PS.get(target_unit)
+        if factor is None:
+            target_unit = target_unit.lower()
+            factor = self.UNIT_TO_PS.get(target_unit)
+            if factor is None:
+                raise ValueError(f"不支持的单位: {target_unit}")
+        return ps_value / factor
     
     def convert(self, value: float, from_unit: str, to_unit: str) -> float:
         """单位转换"""
@@ -99,6 +124,15 @@ class TimeUnitConverter:
     def convert_string_to_int(self, time_str: str, to_unit: Optional[str] = None) -> int:
         """解析并转换时间字符串为整数"""
         return round(self.convert_string(time_str, to_unit))
+    
+    def to_ns_int(self, time_str: str) -> int:
+        """解析时间字符串并转换为纳秒整数
+        
+        等价于 convert_string_to_int(time_str, "ns")，parse_time_string 返回的单位已是小写，
+        省去 convert/to_ps/from_ps 的调用和单位检查；先乘后除，保证与原来的舍入结果一致。
+        """
+        value, unit = self.parse_time_string(time_str)
+        return round(value * self.UNIT_TO_PS[unit] / 1000)
 
 
 # 全局默认实例
@@ -118,7 +152,12 @@ def convert_to_ns(time_str: str) -> float:
     return get_default_converter().convert_string(time_str, "ns")
 
 
+@lru_cache(maxsize=2048)
 def convert_to_ns_int(time_str: str) -> int:
-    """将时间字符串转换为纳秒（整数）"""
-    return get_default_converter().convert_string_to_int(time_str, "ns")
+    """将时间字符串转换为纳秒（整数）
+    
+    Timing 中同样的沿/周期字符串（如 "0ns", "25ns", "100ns"）会反复出现，结果按字符串缓存。
+    转换结果与转换器的默认输出单位无关，缓存不需要失效。
+    """
+    return get_default_converter().to_ns_int(time_str)
 
@@ -10,9 +10,11 @@ CLOCK0 <0,1,2> 0
 STROBE0 <3,4> 25,75
 """
 
+import io
 import os
 import sys
-from typing import Dict, List, Optional, Set, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set, TextIO, Tuple
 
 # 添加父目录到路径
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -20,31 +22,98 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from TimingData import TimingData
-from htol.TimeUnitConverter import TimeUnitConverter
+from htol.TimeUnitConverter import convert_to_ns_int
+
+
+def _merge_ranges(sorted_channels: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    """把已排序、去重的通道号合并成连续区间 [(start, end), ...]"""
+    ranges = []
+    start = end = sorted_channels[0]
+    for channel in sorted_channels[1:]:
+        if channel == end + 1:
+            end = channel
+        else:
+            ranges.append((start, end))
+            start = end = channel
+    ranges.append((start, end))
+    return ranges
+
+
+@lru_cache(maxsize=512)
+def _format_channels_cached(sorted_channels: Tuple[int, ...]) -> str:
+    """格式化已排序、去重的通道号元组（按元组缓存）"""
+    if not sorted_channels:
+        return "<>"
+    
+    if len(sorted_channels) == 1:
+        return f"<{sorted_channels[0]}>"
+    
+    parts = []
+    for start, end in _merge_ranges(sorted_channels):
+        if start == end:
+            # 单个数字
+            parts.append(str(start))
+        elif end - start == 1:
+            # 两个连续数字，不用"-"
+            parts.append(f"{start},{end}")
+        else:
+            # 3个或以上连续数字，用"-"
+            parts.append(f"{start}-{end}")
+    
+    return "<" + ",".join(parts) + ">"
+
+
+@lru_cache(maxsize=256)
+def _format_edges(edge1: Optional[int], edge2: Optional[int]) -> str:
+    """格式化沿值（按沿值缓存，同样的沿在各信号间大量重复）"""
+    if edge1 is None:
+        return "0"
+    elif edge2 is None:
+        return str(edge1)
+    else:
+        return f"{edge1},{edge2}"
 
 
 class TimingFormatter:
     """Timing格式转换器"""
     
+    __slots__ = ("signal_groups", "signal_to_channels",
+                 "wft_to_rradr", "next_rradr", "_channels_cache")
+    
     def __init__(self, 
                  signal_groups: Dict[str, List[str]] = None,
                  signal_to_channels: Dict[str, List[int]] = None):
         """初始化转换器"""
         self.signal_groups = signal_groups or {}
         self.signal_to_channels = signal_to_channels or {}
-        self.time_converter = TimeUnitConverter(default_output_unit="ns")
         
-        # 波形表编号映射
+        # 波形表编号映射（最多 8 项，普通 dict 不会扩容，无需预留）
         self.wft_to_rradr: Dict[str, int] = {}
         self.next_rradr = 0
+        
+        # 信号（或信号组）到通道号的缓存，信号组或通道映射变化时重置
+        self._channels_cache: Dict[str, Optional[Tuple[int, ...]]]
+        self._reset_channels_cache()
+    
+    def _reset_channels_cache(self) -> None:
+        """重置通道缓存
+        
+        键集合就是信号组名和信号名，直接用 dict.fromkeys 预先占位（值为 None 表示未计算），
+        之后按需填充时不会再触发 dict 扩容
+        """
+        cache = dict.fromkeys(self.signal_groups)
+        cache.update(dict.fromkeys(self.signal_to_channels))
+        self._channels_cache = cache
     
     def set_signal_groups(self, signal_groups: Dict[str, List[str]]) -> None:
         """设置信号组映射"""
         self.signal_groups = signal_groups
+        self._reset_channels_cache()
     
     def set_channel_mapping(self, signal_to_channels: Dict[str, List[int]]) -> None:
         """设置信号到通道映射"""
         self.signal_to_channels = signal_to_channels
+        self._reset_channels_cache()
     
     def get_rradr_number(self, wft_name: str) -> int:
         """获取波形表对应的RRADR编号 (0-7)"""
@@ -55,8 +124,12 @@ class TimingFormatter:
             self.next_rradr += 1
         return self.wft_to_rradr[wft_name]
     
-    def get_channels_for_signal(self, signal_name: str) -> List[int]:
-        """获取信号对应的所有通道号"""
+    def get_channels_for_signal(self, signal_name: str) -> Tuple[int, ...]:
+        """获取信号对应的所有通道号（升序、去重，按信号名缓存）"""
+        cached = self._channels_cache.get(signal_name)
+        if cached is not None:
+            return cached
+        
         channels: List[int] = []
         
         if signal_name in self.signal_groups:
@@ -66,38 +139,38 @@ class TimingFormatter:
         elif signal_name in self.signal_to_channels:
             channels.extend(self.signal_to_channels[signal_name])
         
-        return sorted(set(channels))
+        result = tuple(sorted(set(channels)))
+        self._channels_cache[signal_name] = result
+        return result
     
     def extract_middle_edges(self, timing_data: TimingData) -> Tuple[Optional[int], Optional[int]]:
         """从TimingData中提取中间两个沿的时间值（转换为ns整数）
         
         注意：只有时间和沿内容都存在时才算有效的沿
         """
-        edges = []
+        # 一次性取出 8 个属性，避免重复的属性查找
+        t1, t2, t3, t4 = timing_data.t1, timing_data.t2, timing_data.t3, timing_data.t4
+        e1, e2, e3, e4 = timing_data.e1, timing_data.e2, timing_data.e3, timing_data.e4
         
         # 只有当时间和沿内容都存在时才算有效的沿
-        if timing_data.t1 and timing_data.e1:
-            edges.append(timing_data.t1)
-        if timing_data.t2 and timing_data.e2:
-            edges.append(timing_data.t2)
-        if timing_data.t3 and timing_data.e3:
-            edges.append(timing_data.t3)
-        if timing_data.t4 and timing_data.e4:
-            edges.append(timing_data.t4)
-        
-        if len(edges) == 0:
+        edges = []
+        if t1 and e1:
+            edges.append(t1)
+        if t2 and e2:
+            edges.append(t2)
+        if t3 and e3:
+            edges.append(t3)
+        if t4 and e4:
+            edges.append(t4)
+        
+        n = len(edges)
+        if n == 0:
             return (None, None)
-        elif len(edges) == 1:
-            ns_val = self.time_converter.convert_string_to_int(edges[0])
-            return (ns_val, None)
-        elif len(edges) == 2:
-            ns_val1 = self.time_converter.convert_string_to_int(edges[0])
-            ns_val2 = self.time_converter.convert_string_to_int(edges[1])
-            return (ns_val1, ns_val2)
-        else:
-            ns_val1 = self.time_converter.convert_string_to_int(edges[1])
-            ns_val2 = self.time_converter.convert_string_to_int(edges[2])
-            return (ns_val1, ns_val2)
+        if n == 1:
+            return (convert_to_ns_int(edges[0]), None)
+        if n == 2:
+            return (convert_to_ns_int(edges[0]), convert_to_ns_int(edges[1]))
+        return (convert_to_ns_int(edges[1]), convert_to_ns_int(edges[2]))
     
     def format_channels(self, channels: List[int]) -> str:
         """格式化通道号列表
@@ -105,75 +178,43 @@ class TimingFormatter:
         连续的数字使用"-"连接，如 3,4,5,6,7 -> 3-7
         非连续的数字用逗号分隔
         """
-        if not channels:
-            return "<>"
-        
-        # 排序并去重
-        sorted_channels = sorted(set(channels))
-        
-        if len(sorted_channels) == 1:
-            return f"<{sorted_channels[0]}>"
-        
-        # 找出连续区间
-        ranges = []
-        start = sorted_channels[0]
-        end = sorted_channels[0]
-        
-        for i in range(1, len(sorted_channels)):
-            if sorted_channels[i] == end + 1:
-                # 连续，扩展区间
-                end = sorted_channels[i]
-            else:
-                # 不连续，保存当前区间，开始新区间
-                ranges.append((start, end))
-                start = sorted_channels[i]
-                end = sorted_channels[i]
-        
-        # 保存最后一个区间
-        ranges.append((start, end))
-        
-        # 格式化输出
-        parts = []
-        for start, end in ranges:
-            if start == end:
-                # 单个数字
-                parts.append(str(start))
-            elif end - start == 1:
-                # 两个连续数字，不用"-"
-                parts.append(f"{start},{end}")
-            else:
-                # 3个或以上连续数字，用"-"
-                parts.append(f"{start}-{end}")
-        
-        return "<" + ",".join(parts) + ">"
+        return _format_channels_cached(tuple(sorted(set(channels))))
     
     def format_edges(self, edge1: Optional[int], edge2: Optional[int]) -> str:
         """格式化沿值"""
-        if edge1 is None:
-            return "0"
-        elif edge2 is None:
-            return str(edge1)
-        else:
-            return f"{edge1},{edge2}"
+        return _format_edges(edge1, edge2)
     
     def format_timing_group(self, wft_name: str, timing_list: List[TimingData]) -> str:
         """格式化一个波形表的Timing定义"""
-        lines = []
+        buf = io.StringIO()
+        self.write_timing_group(wft_name, timing_list, buf.write)
+        return buf.getvalue()
+    
+    def write_timing_group(self, wft_name: str, timing_list: List[TimingData],
+                           write: Callable[[str], object]) -> None:
+        """把一个波形表的Timing定义直接写出（行之间用换行分隔，末尾不带换行）
         
+        Args:
+            wft_name: 波形表名
+            timing_list: 该波形表的 TimingData 列表
+            write: 写字符串的函数，如 StringIO.write 或文件的 write
+        """
         rradr = self.get_rradr_number(wft_name)
-        lines.append(f"RRADR {rradr}")
+        write(f"RRADR {rradr}")
         
         if timing_list and timing_list[0].period:
-            period_ns = self.time_converter.convert_string_to_int(timing_list[0].period)
-            lines.append(f"REP_RATE {period_ns}")
+            period_ns = convert_to_ns_int(timing_list[0].period)
+            write(f"\nREP_RATE {period_ns}")
         
-        lines.append("")
+        # 空行
+        write("\n")
         
         processed_signals_clock: Set[str] = set()
         processed_signals_strobe: Set[str] = set()
         
-        clock_lines: List[str] = []
-        strobe_lines: List[str] = []
+        # CLOCK 行直接写出，STROBE 行要排在所有 CLOCK 行之后，先写入单独的缓冲区
+        strobe_buf = io.StringIO()
+        write_strobe = strobe_buf.write
         
         for td in timing_list:
             
@@ -186,54 +227,63 @@ class TimingFormatter:
                 continue
             
             edge1, edge2 = self.extract_middle_edges(td)
+            channel_str = _format_channels_cached(channels)
+            edge_str = _format_edges(edge1, edge2)
+            is_strobe = td.is_strobe
             
             # 如果td.is_strobe == 2，则认为既是strobe又是clock
-            if td.is_strobe == 2:
-                if signal not in processed_signals_clock and td.edge_format:
+            # 每个信号只输出第一次出现的定义：add 之后集合长度变化才说明是第一次，只做一次哈希操作
+            if is_strobe == 2:
+                if td.edge_format:
+                    seen = len(processed_signals_clock)
                     processed_signals_clock.add(signal)
-                    channel_str = self.format_channels(channels)
-                    edge_str = self.format_edges(edge1, edge2)
-                    clock_lines.append(f"CLOCK{rradr} {channel_str} {edge_str}")
-                    clock_lines.append(f"FORMAT {channel_str} {td.edge_format}")
-                if signal not in processed_signals_strobe:
-                    processed_signals_strobe.add(signal)
-                    channel_str = self.format_channels(channels)
-                    edge_str = self.format_edges(edge1, edge2)
-                    strobe_lines.append(f"STROBE{rradr} {channel_str} {edge_str}")
+                    if len(processed_signals_clock) != seen:
+                        write(f"\nCLOCK{rradr} {channel_str} {edge_str}")
+                        write(f"\nFORMAT {channel_str} {td.edge_format}")
+                seen = len(processed_signals_strobe)
+                processed_signals_strobe.add(signal)
+                if len(processed_signals_strobe) != seen:
+                    write_strobe(f"\nSTROBE{rradr} {channel_str} {edge_str}")
             # 使用 TimingData 的属性判断
-            elif td.is_strobe == 0:
-                if signal not in processed_signals_strobe:
-                    processed_signals_strobe.add(signal)
-                    channel_str = self.format_channels(channels)
-                    edge_str = self.format_edges(edge1, edge2)
-                    strobe_lines.append(f"STROBE{rradr} {channel_str} {edge_str}")
-            elif td.is_strobe == 1:
-                if signal not in processed_signals_clock:
-                    processed_signals_clock.add(signal)
-                    channel_str = self.format_channels(channels)
-                    edge_str = self.format_edges(edge1, edge2)
-                    clock_lines.append(f"CLOCK{rradr} {channel_str} {edge_str}")
+            elif is_strobe == 0:
+                seen = len(processed_signals_strobe)
+                processed_signals_strobe.add(signal)
+                if len(processed_signals_strobe) != seen:
+                    write_strobe(f"\nSTROBE{rradr} {channel_str} {edge_str}")
+            elif is_strobe == 1:
+                seen = len(processed_signals_clock)
+                processed_signals_clock.add(signal)
+                if len(processed_signals_clock) != seen:
+                    write(f"\nCLOCK{rradr} {channel_str} {edge_str}")
                     if td.edge_format:
-                        clock_lines.append(f"FORMAT {channel_str} {td.edge_format}")
-
+                        write(f"\nFORMAT {channel_str} {td.edge_format}")
         
-        lines.extend(clock_lines)
-        lines.extend(strobe_lines)
-        
-        return "\n".join(lines)
+        write(strobe_buf.getvalue())
     
-    def format_all_timings(self, timings: Dict[str, List[TimingData]]) -> str:
-        """格式化所有Timing定义"""
+    def format_all_timings(self, timings: Dict[str, List[TimingData]],
+                           out: Optional[TextIO] = None) -> Optional[str]:
+        """格式化所有Timing定义
+        
+        Args:
+            timings: {波形表名: TimingData 列表}
+            out: 文本输出对象；为 None 时返回格式化后的字符串，否则直接写入 out 并返回 None
+        """
         self.wft_to_rradr.clear()
         self.next_rradr = 0
+        # 映射可能被原地修改过，每次重新格式化都重新计算通道
+        self._reset_channels_cache()
         
-        result_parts = []
+        buf = io.StringIO() if out is None else out
+        write = buf.write
         
+        first = True
         for wft_name, timing_list in timings.items():
-            formatted = self.format_timing_group(wft_name, timing_list)
-            result_parts.append(formatted)
+            if not first:
+                write("\n\n")
+            first = False
+            self.write_timing_group(wft_name, timing_list, write)
         
-        return "\n\n".join(result_parts)
+        return buf.getvalue() if out is None else None
     
     def get_wft_mapping(self) -> Dict[str, int]:
         """获取波形表到RRADR编号的映射"""
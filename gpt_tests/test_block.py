@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+import mmap
 import os
 import sys
 import time
+from contextlib import closing
 from lark import Lark, Tree, Token, LarkError
 from STILToGasc import STILToGasc 
 from STILToGascStream import STILToGascStream
@@ -17,6 +19,59 @@ def get_stil_file(file_name):
     folder = os.path.dirname(__file__)
     return os.path.join(str(folder), "stil_files", file_name)
 
+def iter_mmap_lines(path):
+    """用 mmap 按行遍历文件（每行为带换行符的 bytes，不做解码）
+
+    与文本模式读取一致，行尾的 \\r\\n 统一成 \\n
+    """
+    with open(path, 'rb') as f:
+        # 空文件不能 mmap（会抛 ValueError），直接结束
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            size = len(mm)
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                end = size if end < 0 else end + 1
+                line = mm[pos:end]
+                if line.endswith(b"\r\n"):
+                    line = line[:-2] + b"\n"
+                yield line
+                pos = end
+
+def brace_delta(line, in_ann=False):
+    """统计一行中代码部分的花括号增量（跳过 Ann {* ... *} 注释和 // 注释）
+
+    Args:
+        line: 一行的 bytes
+        in_ann: 行首是否处在跨行的 Ann {* ... *} 注释内
+
+    Returns:
+        (花括号增量, 行末是否仍在 Ann 注释内)
+    """
+    delta = 0
+    pos = 0
+    while True:
+        if in_ann:
+            end = line.find(b'*}', pos)
+            if end < 0:
+                return delta, True
+            pos = end + 2
+            in_ann = False
+        ann = line.find(b'{*', pos)
+        comment = line.find(b'//', pos)
+        if comment >= 0 and (ann < 0 or comment < ann):
+            code = line[pos:comment]
+            return delta + code.count(b'{') - code.count(b'}'), False
+        if ann < 0:
+            code = line[pos:]
+            return delta + code.count(b'{') - code.count(b'}'), False
+        code = line[pos:ann]
+        delta += code.count(b'{') - code.count(b'}')
+        pos = ann + 2
+        in_ann = True
+
 def progress_callback(message):
     """Progress callback function with real-time vector counting"""
     print(f"{message}")
@@ -93,9 +148,11 @@ def test_block_1():
     #    lines = f.read().splitlines()
     #for line in lines:
     isPattern = False
-    with open(stil_file, 'r', encoding='utf-8') as f:
+    # mmap 读取文件，按 bytes 逐行扫描，只在语句拼接完整后才解码
+    with closing(iter_mmap_lines(stil_file)) as lines:
         #read every line in the file
-        for line in f:
+        for raw in lines:
+            line = raw.decode('utf-8')
             if line.strip().startswith('Pattern ') and '{' in line:
                 isPattern = True;
                 if debug:
@@ -108,30 +165,35 @@ def test_block_1():
             if not isPattern:
                 header_buffer += line
                 continue
-        for line in f:
-            statement_buffer = "".join(buffer_lines).strip()
+        # 缓冲区中尚未闭合的 '{' 数量，随行增量更新（注释里的花括号不算）
+        depth = 0
+        in_ann = False
+        for line in lines:
+            # 花括号还没闭合时语句一定不完整，不用拼接缓冲区去试解析
+            statement_buffer = b"".join(buffer_lines).strip() if depth <= 0 else b""
             try:
                 # if not contains '{' and end with ';' or statement_buffer equal '}'
-                if ('{' not in statement_buffer and (statement_buffer.endswith(';'))
-                     or statement_buffer.endswith('}')):
+                if (b'{' not in statement_buffer and (statement_buffer.endswith(b';'))
+                     or statement_buffer.endswith(b'}')):
+                    statement_buffer = statement_buffer.decode('utf-8')
                     tree = multi_parser.parse(statement_buffer)
                     stil_to_gasc.process_streaming(tree, 121)
                     buffer_lines.clear()
-                    buffer_lines.append(line)
+                    depth = 0
+                    in_ann = False
                     if debug:
                         print(f"解析成功: {statement_buffer}")
                         stil_to_gasc.flush()
-                    continue
-                # else append line to buffer_lines
-                buffer_lines.append(line)
             except LarkError: 
-                buffer_lines.append(line)
                 if debug:
-                    print(f"解析失败: {line}")
+                    print(f"解析失败: {line.decode('utf-8', 'replace')}")
             except Exception as e:
-                buffer_lines.append(line)
                 if debug:
                     print(f"其他错误: {e}")
+            # 当前行加入缓冲区
+            buffer_lines.append(line)
+            delta, in_ann = brace_delta(line, in_ann)
+            depth += delta
     stil_to_gasc.close()
 
     end = time.time()
@@ -142,6 +204,22 @@ def test_block_1():
         assert False
 
 
+def test_brace_delta():
+    # 注释里不成对的花括号不计入，否则之后的语句都不会再被试解析
+    assert brace_delta(b"Loop 5 {\n") == (1, False)
+    assert brace_delta(b"V { all = PPLL; }\n") == (0, False)
+    assert brace_delta(b"Ann {* unbalanced { here *}\n") == (0, False)
+    assert brace_delta(b"Ann {* } *} V { all = 0; }\n") == (0, False)
+    assert brace_delta(b"V { all = 0; } // closes { later\n") == (0, False)
+    assert brace_delta(b"Loop 2 { // }\n") == (1, False)
+    # 跨行的 Ann 注释
+    assert brace_delta(b"Ann {* first { line\n") == (0, True)
+    assert brace_delta(b"still { inside\n", True) == (0, True)
+    assert brace_delta(b"done *} Loop 3 {\n", True) == (1, False)
+    # 注释内的 // 不结束 Ann，*} 之后的 // 才是注释
+    assert brace_delta(b"Ann {* a // b { *} { // }\n") == (1, False)
+
+
 def test_block_2():
     stil_file = "C:\\Users\\admin\\Desktop\\1\\result\\syn_ok_pattern_block_1.stil"
     target_file_path = "C:\\Users\\admin\\Desktop\\1\\result\\syn_ok_pattern_block_1.gasc"
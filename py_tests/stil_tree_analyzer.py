@@ -9,11 +9,16 @@ STIL树分析器 - 获取和分析parser.parse_syntax()返回的树结构
 3. 生成你需要的格式文件
 """
 
+import contextlib
+import io
 import os
 import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from lark import Tree, Token
+
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -85,56 +90,63 @@ class STILTreeAnalyzer:
             return {}
             
         analysis = {
-            'root_data': str(self.tree.data) if hasattr(self.tree, 'data') else 'N/A',
+            'root_data': str(self.tree.data) if isinstance(self.tree, Tree) else 'N/A',
             'root_type': str(type(self.tree)),
-            'children_count': len(self.tree.children) if hasattr(self.tree, 'children') else 0,
+            'children_count': len(self.tree.children) if isinstance(self.tree, Tree) else 0,
             'children_info': []
         }
         
-        if hasattr(self.tree, 'children'):
+        if isinstance(self.tree, Tree):
             for i, child in enumerate(self.tree.children):
                 child_info = {
                     'index': i,
                     'type': str(type(child)),
-                    'data': str(child.data) if hasattr(child, 'data') else str(child)[:100],
-                    'children_count': len(child.children) if hasattr(child, 'children') else 0
+                    'data': str(child.data) if isinstance(child, Tree) else str(child)[:100],
+                    'children_count': len(child.children) if isinstance(child, Tree) else 0
                 }
                 analysis['children_info'].append(child_info)
         
         return analysis
     
     def extract_tree_data_recursive(self, node, max_depth=10, current_depth=0):
-        """递归提取树的所有数据"""
-        if current_depth > max_depth:
-            return "MAX_DEPTH_REACHED"
-            
-        if hasattr(node, 'data') and hasattr(node, 'children'):
-            # 这是一个Tree节点
-            result = {
-                'type': 'Tree',
-                'data': str(node.data),
-                'children': []
-            }
+        """提取树的所有数据
+        
+        用显式栈做先序遍历代替递归，深层的Pattern树不会触发递归深度限制
+        """
+        # 栈中每项: (父节点的children列表, 节点, 深度)，子节点逆序入栈以保持原顺序
+        root = []
+        stack = [(root, node, current_depth)]
+        while stack:
+            out, node, depth = stack.pop()
             
-            for child in node.children:
-                child_data = self.extract_tree_data_recursive(child, max_depth, current_depth + 1)
-                result['children'].append(child_data)
+            if depth > max_depth:
+                out.append("MAX_DEPTH_REACHED")
                 
-            return result
-            
-        elif hasattr(node, 'value'):
-            # 这是一个Token节点
-            return {
-                'type': 'Token',
-                'value': str(node.value),
-                'token_type': str(node.type) if hasattr(node, 'type') else 'Unknown'
-            }
-        else:
-            # 其他类型的节点
-            return {
-                'type': str(type(node)),
-                'value': str(node)
-            }
+            elif isinstance(node, Tree):
+                # 这是一个Tree节点
+                children = []
+                out.append({
+                    'type': 'Tree',
+                    'data': str(node.data),
+                    'children': children
+                })
+                stack.extend((children, child, depth + 1) for child in reversed(node.children))
+                
+            elif isinstance(node, Token):
+                # 这是一个Token节点
+                out.append({
+                    'type': 'Token',
+                    'value': str(node.value),
+                    'token_type': str(node.type)
+                })
+            else:
+                # 其他类型的节点
+                out.append({
+                    'type': str(type(node)),
+                    'value': str(node)
+                })
+        
+        return root[0]
     
     def get_tree_as_dict(self, max_depth=10):
         """将整个树转换为字典格式"""
@@ -150,8 +162,9 @@ class STILTreeAnalyzer:
         """保存树结构为JSON文件"""
         tree_dict = self.get_tree_as_dict(max_depth)
         
+        # json.dumps 一次性编码（可走C编码器），再整体写入；json.dump 会逐块调用 write
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(tree_dict, f, indent=2, ensure_ascii=False)
+            f.write(json.dumps(tree_dict, indent=2, ensure_ascii=False))
         
         print(f"树结构已保存到: {output_file}")
     
@@ -168,33 +181,40 @@ class STILTreeAnalyzer:
             'pattern_burst_blocks': []
         }
         
-        def search_blocks(node):
-            if hasattr(node, 'data'):
-                data_str = str(node.data)
-                if 'signals_block' in data_str:
-                    blocks['signals_blocks'].append(node)
-                elif 'signal_groups_block' in data_str:
-                    blocks['signal_groups_blocks'].append(node)
-                elif 'timing_block' in data_str:
-                    blocks['timing_blocks'].append(node)
-                elif 'pattern_block' in data_str:
-                    blocks['pattern_blocks'].append(node)
-                elif 'pattern_burst_block' in data_str:
-                    blocks['pattern_burst_blocks'].append(node)
-            
-            if hasattr(node, 'children'):
-                for child in node.children:
-                    search_blocks(child)
+        # 按顺序匹配的 (子串, 结果列表)，一个节点只归入第一个匹配的块类型
+        targets = (
+            ('signals_block', blocks['signals_blocks']),
+            ('signal_groups_block', blocks['signal_groups_blocks']),
+            ('timing_block', blocks['timing_blocks']),
+            ('pattern_block', blocks['pattern_blocks']),
+            ('pattern_burst_block', blocks['pattern_burst_blocks']),
+        )
         
-        search_blocks(self.tree)
+        # 显式栈先序遍历，一次扫描填充所有列表
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Tree):
+                data_str = str(node.data)
+                for key, block_list in targets:
+                    if key in data_str:
+                        block_list.append(node)
+                        break
+                stack.extend(reversed(node.children))
         
         # 统计信息
         summary = {block_type: len(block_list) for block_type, block_list in blocks.items()}
         
         return blocks, summary
     
-    def generate_analysis_report(self, output_file):
-        """生成完整的分析报告"""
+    def generate_analysis_report(self, output_file, include_pretty=False, include_full_tree=False):
+        """生成完整的分析报告
+        
+        Args:
+            output_file: 报告文件路径
+            include_pretty: 是否包含 tree.pretty() 文本（大文件时可达数MB）
+            include_full_tree: 是否包含完整的树数据（需要再遍历一遍整棵树）
+        """
         if self.tree is None:
             print("请先解析文件")
             return
@@ -210,13 +230,15 @@ class STILTreeAnalyzer:
             },
             'tree_structure': structure_analysis,
             'block_summary': block_summary,
-            'tree_pretty_print': self.tree.pretty(),
-            'full_tree_data': self.get_tree_as_dict(max_depth=15)
         }
+        if include_pretty:
+            report['tree_pretty_print'] = self.tree.pretty()
+        if include_full_tree:
+            report['full_tree_data'] = self.get_tree_as_dict(max_depth=15)
         
         # 保存报告
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write(json.dumps(report, indent=2, ensure_ascii=False))
         
         print(f"完整分析报告已保存到: {output_file}")
         
@@ -233,19 +255,16 @@ class STILTreeAnalyzer:
                 print(f"  {block_type}: {count}个")
 
 
-def main():
-    """主函数 - 演示如何使用树分析器"""
-    
-    # 测试文件列表
-    test_files = [
-        "tests/stil_files/pattern_block/syn_ok_pattern_block_1.stil",
-        "tests/stil_files/signals_block/sem_ok_signals_block_1.stil",
-    ]
+def analyze_file(test_file):
+    """分析单个STIL文件，返回打印输出的文本
     
-    for test_file in test_files:
+    在子进程中执行，所以是模块级函数（可被pickle）；输出先收集起来，避免多个进程的打印交错
+    """
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
         if not os.path.exists(test_file):
             print(f"跳过不存在的文件: {test_file}")
-            continue
+            return buf.getvalue()
             
         print(f"\n{'='*100}")
         print(f"分析文件: {test_file}")
@@ -275,6 +294,23 @@ def main():
         
         else:
             print("文件解析失败，跳过分析")
+    
+    return buf.getvalue()
+
+
+def main():
+    """主函数 - 演示如何使用树分析器"""
+    
+    # 测试文件列表
+    test_files = [
+        "tests/stil_files/pattern_block/syn_ok_pattern_block_1.stil",
+        "tests/stil_files/signals_block/sem_ok_signals_block_1.stil",
+    ]
+    
+    # 各文件的解析互不依赖，用多进程并行分析，按文件顺序输出结果
+    with ProcessPoolExecutor() as executor:
+        for output in executor.map(analyze_file, test_files):
+            print(output, end="")
 
 
 if __name__ == "__main__":
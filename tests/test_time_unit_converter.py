@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+
+import pytest
+
+# gpt_tests 下的转换工具需要 Python 3.13（warnings.deprecated 等）
+if sys.version_info < (3, 13):
+    pytest.skip("gpt_tests 转换工具需要 Python 3.13+", allow_module_level=True)
+
+gpt_tests_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpt_tests")
+if gpt_tests_dir not in sys.path:
+    sys.path.insert(0, gpt_tests_dir)
+
+from htol.TimeUnitConverter import TimeUnitConverter, convert_to_ns_int
+
+
+# 快速路径加入之前的实现，独立于被测模块：大小写不敏感的正则 + 小写单位表
+REFERENCE_TIME_RE = re.compile(
+    r"^([+-]?\d*\.?\d+(?:[eE][+-]?\d+)?)\s*(ps|ns|us|ms|s|pS|nS|uS|mS|S)?$", re.IGNORECASE)
+REFERENCE_UNIT_TO_PS = {"ps": 1, "ns": 1000, "us": 1000000, "ms": 1000000000, "s": 1000000000000}
+
+
+def regex_parse(time_str):
+    """参考解析：返回 (数值, 单位)"""
+    if not time_str:
+        return (0.0, "ns")
+    time_str = time_str.strip()
+    match = REFERENCE_TIME_RE.match(time_str)
+    if not match:
+        raise ValueError(f"无法解析时间字符串: {time_str}")
+    return (float(match.group(1)), match.group(2).lower() if match.group(2) else "ns")
+
+
+def regex_to_ns_int(time_str):
+    """参考转换：先换算成 ps 再换算成 ns，最后取整"""
+    value, unit = regex_parse(time_str)
+    if unit not in REFERENCE_UNIT_TO_PS:
+        raise ValueError(f"不支持的单位: {unit}")
+    return round(value * REFERENCE_UNIT_TO_PS[unit] / REFERENCE_UNIT_TO_PS["ns"])
+
+
+TIME_STRINGS = [
+    # 空串
+    "",
+    # 整数
+    "0", "7", "100", "0100", "123456789",
+    # 小数
+    "1.5", ".5", "0.25", "2.", "1..5", "1.2.3",
+    # 科学计数法
+    "1e3", "1E3", "1.5e-3", "2.5E+2", "1e", "e3",
+    # 各种单位（含大小写）
+    "100ps", "100ns", "1.5us", "2ms", "3s",
+    "100PS", "100Ns", "1.5US", "2mS", "3S",
+    "1e3ps", "1.5e-3us", "2E2ms",
+    # 符号
+    "+5ns", "-5ns", "-1.5us", "+.5",
+    # 空白
+    " 100ns", "100ns ", "100 ns", "\t1.5\tus\n", "  ",
+    # 非法字符串
+    "abc", "ns", "100fs", "100sec", "100 n s", "1/3ns", "1,5ns", "100nsX",
+    # 非 ASCII 数字
+    "٣ns", "²ns",
+    # 大小写不敏感匹配时 "ſ"（长 s）等同于 "s"，但不是合法单位
+    "5ſ",
+]
+
+
+@pytest.mark.parametrize("time_str", TIME_STRINGS)
+def test_fast_path_matches_regex(time_str):
+    converter = TimeUnitConverter()
+    try:
+        expected = regex_parse(time_str)
+    except ValueError:
+        with pytest.raises(ValueError):
+            converter.parse_time_string(time_str)
+    else:
+        if expected[1] in REFERENCE_UNIT_TO_PS:
+            assert converter.parse_time_string(time_str) == expected
+
+    try:
+        expected_ns = regex_to_ns_int(time_str)
+    except ValueError:
+        with pytest.raises(ValueError):
+            converter.to_ns_int(time_str)
+        with pytest.raises(ValueError):
+            converter.convert_string_to_int(time_str, "ns")
+        return
+
+    assert converter.to_ns_int(time_str) == expected_ns
+    assert converter.convert_string_to_int(time_str, "ns") == expected_ns
+    assert convert_to_ns_int(time_str) == expected_ns
+
+
+@pytest.mark.parametrize("time_str, expected", [
+    ("0.5ns", 0),
+    ("1.5ns", 2),
+    ("2.5ns", 2),
+    ("1499ps", 1),
+    ("1500ps", 2),
+    ("2500ps", 2),
+    ("0.0015us", 2),
+    ("1.5e-3us", 2),
+])
+def test_to_ns_int_rounding(time_str, expected):
+    assert TimeUnitConverter().to_ns_int(time_str) == expected
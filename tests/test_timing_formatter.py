@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+# gpt_tests 下的转换工具需要 Python 3.13（warnings.deprecated 等）
+if sys.version_info < (3, 13):
+    pytest.skip("gpt_tests 转换工具需要 Python 3.13+", allow_module_level=True)
+
+gpt_tests_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpt_tests")
+if gpt_tests_dir not in sys.path:
+    sys.path.insert(0, gpt_tests_dir)
+
+from TimingData import TimingData
+from htol.TimingFormatter import TimingFormatter
+
+
+SIGNAL_TO_CHANNELS = {
+    "CLK": [2, 0, 1],
+    "DIN": [3],
+    "DOUT": [4, 5],
+    "IO": [8, 7],
+    "RST": [10],
+    "EN": [12],
+}
+
+SIGNAL_GROUPS = {
+    "BUS": ["DIN", "CLK"],
+}
+
+
+def make_timings():
+    wft_a = [
+        # 3 个沿的时钟，取中间两个沿
+        TimingData(wft="wft_a", period="100ns", signal="CLK", wfc="P",
+                   t1="0ns", e1="D", t2="25ns", e2="U", t3="75ns", e3="D",
+                   is_strobe=1, edge_format="RZ"),
+        # 同一信号的第二个波形不再输出
+        TimingData(wft="wft_a", period="100ns", signal="CLK", wfc="0",
+                   t1="0ns", e1="D", is_strobe=1, edge_format="NRZ"),
+        # 1 个沿，没有边沿格式
+        TimingData(wft="wft_a", period="100ns", signal="DIN", wfc="1",
+                   t1="5ns", e1="U", is_strobe=1),
+        # 2 个沿的比较
+        TimingData(wft="wft_a", period="100ns", signal="DOUT", wfc="L",
+                   t1="0ns", e1="Z", t2="50ns", e2="L", is_strobe=0),
+        # InOut：既输出 CLOCK/FORMAT 也输出 STROBE
+        TimingData(wft="wft_a", period="100ns", signal="IO", wfc="H",
+                   t1="10ns", e1="D", t2="60ns", e2="U", is_strobe=2, edge_format="NRZ"),
+        # InOut 没有边沿格式：只输出 STROBE，1.5ns 四舍五入到 2
+        TimingData(wft="wft_a", period="100ns", signal="RST", wfc="X",
+                   t1="1.5ns", e1="X", is_strobe=2),
+        # 未映射的信号、空信号名、未知的 is_strobe 都不输出
+        TimingData(wft="wft_a", period="100ns", signal="NOMAP", wfc="0",
+                   t1="0ns", e1="D", is_strobe=1),
+        TimingData(wft="wft_a", period="100ns", signal="", wfc="0",
+                   t1="0ns", e1="D", is_strobe=1),
+        TimingData(wft="wft_a", period="100ns", signal="DIN", wfc="Z",
+                   t1="0ns", e1="Z", is_strobe=3),
+        # 有时间没有沿内容：不算有效沿
+        TimingData(wft="wft_a", period="100ns", signal="EN", wfc="0",
+                   t1="30ns", is_strobe=1),
+    ]
+    wft_b = [
+        # 信号组，1 个沿
+        TimingData(wft="wft_b", signal="BUS", wfc="0",
+                   t1="0ns", e1="D", is_strobe=1, edge_format="NRZ"),
+        # 4 个沿，取中间两个
+        TimingData(wft="wft_b", signal="EN", wfc="P",
+                   t1="0ns", e1="D", t2="10ns", e2="U", t3="20ns", e3="D", t4="30ns", e4="U",
+                   is_strobe=1),
+        # 3 个沿的比较
+        TimingData(wft="wft_b", signal="DOUT", wfc="H",
+                   t1="0ns", e1="Z", t2="20ns", e2="H", t3="80ns", e3="X", is_strobe=0),
+    ]
+    return {"wft_a": wft_a, "wft_b": wft_b}
+
+
+EXPECTED = {
+    "wft_a": "\n".join([
+        "RRADR 0",
+        "REP_RATE 100",
+        "",
+        "CLOCK0 <0-2> 25,75",
+        "FORMAT <0-2> RZ",
+        "CLOCK0 <3> 5",
+        "CLOCK0 <7,8> 10,60",
+        "FORMAT <7,8> NRZ",
+        "CLOCK0 <12> 0",
+        "STROBE0 <4,5> 0,50",
+        "STROBE0 <7,8> 10,60",
+        "STROBE0 <10> 2",
+    ]),
+    "wft_b": "\n".join([
+        "RRADR 1",
+        "",
+        "CLOCK1 <0-3> 0",
+        "FORMAT <0-3> NRZ",
+        "CLOCK1 <12> 10,20",
+        "STROBE1 <4,5> 20,80",
+    ]),
+}
+
+
+def make_formatter():
+    return TimingFormatter(SIGNAL_GROUPS, SIGNAL_TO_CHANNELS)
+
+
+def test_format_timing_group():
+    formatter = make_formatter()
+    for wft_name, timing_list in make_timings().items():
+        assert formatter.format_timing_group(wft_name, timing_list) == EXPECTED[wft_name]
+
+
+def test_write_timing_group():
+    formatter = make_formatter()
+    for wft_name, timing_list in make_timings().items():
+        pieces = []
+        formatter.write_timing_group(wft_name, timing_list, pieces.append)
+        assert "".join(pieces) == EXPECTED[wft_name]
+
+
+def test_format_all_timings():
+    expected = EXPECTED["wft_a"] + "\n\n" + EXPECTED["wft_b"]
+    formatter = make_formatter()
+    assert formatter.format_all_timings(make_timings()) == expected
+    # 重复格式化时 RRADR 编号重新分配
+    assert formatter.format_all_timings(make_timings()) == expected
+
+    out = io.StringIO()
+    assert make_formatter().format_all_timings(make_timings(), out) is None
+    assert out.getvalue() == expected
+
+
+def test_format_after_mapping_change():
+    formatter = make_formatter()
+    timings = make_timings()
+    formatter.format_all_timings(timings)
+    formatter.set_channel_mapping({**SIGNAL_TO_CHANNELS, "DOUT": [20, 21, 22]})
+    assert "STROBE0 <20-22> 0,50" in formatter.format_all_timings(timings)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import pytest
+
+# gpt_tests 下的转换工具需要 Python 3.13（warnings.deprecated 等）
+if sys.version_info < (3, 13):
+    pytest.skip("gpt_tests 转换工具需要 Python 3.13+", allow_module_level=True)
+
+gpt_tests_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpt_tests")
+if gpt_tests_dir not in sys.path:
+    sys.path.insert(0, gpt_tests_dir)
+
+from htol.STILToVCTStream import STILToVCTStream
+
+
+def make_converter(messages):
+    return STILToVCTStream(os.path.join(gpt_tests_dir, "utc_010_bypass.stil"), "",
+                           progress_callback=messages.append)
+
+
+@pytest.mark.parametrize("channel_str, expected", [
+    ("", []),
+    ("  ", []),
+    ("0", [0]),
+    ("1,2,3", [1, 2, 3]),
+    (" 7 , 8 ,, 9 ", [7, 8, 9]),
+    ("255,256,-1", [255]),
+    ("+3,-0", [3, 0]),
+    ("٣,١٠", [3, 10]),
+    ("1,²", [1]),
+    ("①,2", [2]),
+    ("a,4,0x5", [4]),
+])
+def test_parse_channel_string(channel_str, expected):
+    assert make_converter([]).parse_channel_string(channel_str) == expected
+
+
+def test_parse_channel_string_warnings():
+    messages = []
+    converter = make_converter(messages)
+    messages.clear()
+    assert converter.parse_channel_string("1,²,300,x") == [1]
+    assert messages == [
+        "Warning: Channel 300 out of range (0-255)",
+        "Warning: '²', 'x' is not a valid number",
+    ]
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import sys
+
+import pytest
+
+# gpt_tests 下的转换工具需要 Python 3.13（warnings.deprecated 等）
+if sys.version_info < (3, 13):
+    pytest.skip("gpt_tests 转换工具需要 Python 3.13+", allow_module_level=True)
+
+gpt_tests_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpt_tests")
+if gpt_tests_dir not in sys.path:
+    sys.path.insert(0, gpt_tests_dir)
+
+from htol.STILToVCTStream import _IDENTITY_LUT, _build_fill_plan, _fill_row
+
+
+def naive_fill(row, wfc, signals, luts, channel_index):
+    """逐字符的参考实现：按信号顺序把替换后的 WFC 写入该信号的每个通道"""
+    for idx, signal in enumerate(signals):
+        if idx >= len(wfc):
+            break
+        lut = luts.get(signal, _IDENTITY_LUT)
+        for channel in channel_index.get(signal, ()):
+            row[channel] = lut[wfc[idx]]
+
+
+def make_lut(mapping):
+    lut = bytearray(_IDENTITY_LUT)
+    for src, dst in mapping.items():
+        lut[ord(src)] = ord(dst)
+    return bytes(lut)
+
+
+def check_fill(signals, luts, channel_index, wfc, start_row=None):
+    if start_row is None:
+        start_row = b"." * 256
+    plan = _build_fill_plan(signals, luts, channel_index)
+    expected = bytearray(start_row)
+    naive_fill(expected, wfc, signals, luts, channel_index)
+    actual = bytearray(start_row)
+    _fill_row(actual, wfc, plan)
+    assert actual == expected, (signals, channel_index, wfc)
+
+
+SIGNALS = [f"s{i}" for i in range(8)]
+LUT = make_lut({"P": "1", "L": "0", "H": "H", "X": "."})
+
+
+@pytest.mark.parametrize("channel_index", [
+    # 连续升序：整组合并成一段
+    {s: (i,) for i, s in enumerate(SIGNALS)},
+    # 等步长
+    {s: (10 + 3 * i,) for i, s in enumerate(SIGNALS)},
+    # 逆序通道
+    {s: (200 - i,) for i, s in enumerate(SIGNALS)},
+    # 不连续：每段长度为 1
+    {s: ch for s, ch in zip(SIGNALS, [(5,), (40,), (6,), (90,), (7,), (1,), (255,), (0,)])},
+    # 中间有未映射的信号
+    {s: (i,) for i, s in enumerate(SIGNALS) if i % 3},
+    # 每个信号多个通道（多 DUT）
+    {s: (i, 64 + i, 128 + 2 * i) for i, s in enumerate(SIGNALS)},
+    # 通道数不同的信号混在一起
+    {s: tuple(range(20 * i, 20 * i + i % 3 + 1)) for i, s in enumerate(SIGNALS)},
+    # 通道被多个信号共用：后面的信号覆盖前面的
+    {s: (i // 2,) for i, s in enumerate(SIGNALS)},
+    # 同一信号重复的通道
+    {s: (i, i) for i, s in enumerate(SIGNALS)},
+])
+@pytest.mark.parametrize("luts", [
+    {},
+    {s: LUT for s in SIGNALS},
+    {s: LUT for s in SIGNALS[::2]},
+])
+@pytest.mark.parametrize("wfc", [b"PLHXPLHX", b"PLH", b"", b"PLHXPLHXPL"])
+def test_fill_row_layouts(channel_index, luts, wfc):
+    check_fill(SIGNALS, luts, channel_index, wfc)
+
+
+def test_fill_row_random():
+    rng = random.Random(20261017)
+    lut_choices = [_IDENTITY_LUT, LUT, make_lut({"P": "N", "0": "L"})]
+    for _ in range(3000):
+        n = rng.randint(1, 40)
+        signals = [f"sig{i}" for i in range(n)]
+        layout = rng.choice(["asc", "desc", "stride", "random"])
+        base = rng.randint(0, 255)
+        step = rng.choice([1, 2, 3, 7])
+        channel_index = {}
+        for i, signal in enumerate(signals):
+            if rng.random() < 0.15:
+                continue  # 未映射
+            if layout == "asc":
+                first = base + i
+            elif layout == "desc":
+                first = base - i
+            elif layout == "stride":
+                first = base + i * step
+            else:
+                first = rng.randint(0, 255)
+            channels = [first]
+            for k in range(rng.choice([0, 0, 1, 2])):
+                channels.append(rng.choice([first + 64 * (k + 1), rng.randint(0, 255)]))
+            channels = tuple(ch for ch in channels if 0 <= ch <= 255)
+            if channels:
+                channel_index[signal] = channels
+        if rng.random() < 0.5:
+            lut = rng.choice(lut_choices)
+            luts = {s: lut for s in signals}
+        else:
+            luts = {s: rng.choice(lut_choices) for s in signals if rng.random() < 0.7}
+        wfc_len = rng.choice([n, n, rng.randint(0, n), n + 2])
+        wfc = bytes(rng.choice(b"PLHX01NZ") for _ in range(wfc_len))
+        start_row = bytes(rng.choice(b".01LH") for _ in range(256))
+        check_fill(signals, luts, channel_index, wfc, start_row)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import gzip
+import io
+import os
+import sys
+import threading
+
+import pytest
+
+# gpt_tests 下的转换工具需要 Python 3.13（warnings.deprecated 等）
+if sys.version_info < (3, 13):
+    pytest.skip("gpt_tests 转换工具需要 Python 3.13+", allow_module_level=True)
+
+gpt_tests_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpt_tests")
+if gpt_tests_dir not in sys.path:
+    sys.path.insert(0, gpt_tests_dir)
+
+from htol import STILToVCTStream as vct_stream
+from htol.STILToVCTStream import STILToVCTStream
+
+
+def get_stil_file(file_name):
+    return os.path.join(gpt_tests_dir, file_name)
+
+
+def get_golden_file(file_name):
+    """改动写入路径之前的转换器生成的 VCT（通道映射与 make_converter 相同）"""
+    return os.path.join(os.path.dirname(__file__), "stil_files", "vct", file_name)
+
+
+def strip_timestamp(data):
+    """去掉头部的转换时间行，其余内容逐字节比较"""
+    return b"".join(line for line in data.splitlines(keepends=True)
+                    if not line.startswith(b";  translated "))
+
+
+def make_converter(target_file):
+    """创建转换器并配置固定的通道映射，保证多次转换的输出可以逐字节比较"""
+    converter = STILToVCTStream(get_stil_file("utc_010_bypass.stil"), str(target_file))
+    signals = converter.read_stil_signals(print_log=False)
+    mapping = {signal: [(i * 3) % 256, (i * 3 + 1) % 256] for i, signal in enumerate(signals)}
+    # 留一个未映射的信号
+    mapping.pop(signals[-1], None)
+    converter.set_channel_mapping(mapping)
+    return converter
+
+
+def write_serial(converter, f):
+    """单线程参考路径：缓存满了直接同步写入文件对象，不经过写线程"""
+    def flush_lines():
+        if converter._sink:
+            converter.output_file.write(bytes(converter._sink))
+            converter._sink = bytearray()
+    converter._flush_lines = flush_lines
+    assert converter._emit_preamble(f, None)
+    converter.generate_vct_vector_section(f)
+
+
+def write_threaded(converter, f):
+    assert converter._emit_preamble(f, None)
+    converter.generate_vct_vector_section(f)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """把缓存阈值和队列长度调小，让样例文件也会产生大量数据块并触发队列背压"""
+    monkeypatch.setattr(vct_stream, "_SINK_LIMIT", 256)
+    monkeypatch.setattr(vct_stream, "_WRITE_QUEUE_SIZE", 2)
+
+
+@pytest.fixture
+def reference_output(tmp_path):
+    buf = io.BytesIO()
+    write_serial(make_converter(tmp_path / "ref.vct"), buf)
+    return strip_timestamp(buf.getvalue())
+
+
+def test_vct_serial_matches_golden(reference_output):
+    # 单线程参考路径本身也要和原来的输出一致，两条路径共有的回归才能被发现
+    with open(get_golden_file("utc_010_bypass.vct"), "rb") as f:
+        assert reference_output == strip_timestamp(f.read())
+
+
+def test_vct_writer_thread_in_memory(tmp_path, small_chunks, reference_output):
+    # 非 BufferedWriter 的目标走 output_file.write
+    buf = io.BytesIO()
+    write_threaded(make_converter(tmp_path / "mem.vct"), buf)
+    assert b"#VECTOREND" in reference_output
+    assert strip_timestamp(buf.getvalue()) == reference_output
+
+
+def test_vct_writer_thread_text_target(tmp_path, small_chunks, reference_output):
+    # 文本模式的目标按 UTF-8 写入
+    buf = io.StringIO()
+    write_threaded(make_converter(tmp_path / "text.vct"), buf)
+    assert strip_timestamp(buf.getvalue().encode("utf-8")) == reference_output
+
+
+def test_vct_writer_thread_buffered_writer(tmp_path, small_chunks, reference_output):
+    # BufferedWriter 目标走复制出来的文件描述符 + os.write
+    target = tmp_path / "file.vct"
+    with open(target, "wb") as f:
+        assert isinstance(f, io.BufferedWriter)
+        write_threaded(make_converter(target), f)
+        # 写完后文件对象的位置要同步到文件末尾
+        assert f.tell() == os.path.getsize(target)
+    assert strip_timestamp(target.read_bytes()) == reference_output
+
+
+def test_vct_writer_thread_pipe(tmp_path, small_chunks, reference_output, monkeypatch):
+    # 管道不能 seek，BufferedWriter 也不能走文件描述符路径
+    def no_fd_writer(fd):
+        raise AssertionError("管道目标不应走 os.write 路径")
+
+    monkeypatch.setattr(vct_stream, "_make_fd_writer", no_fd_writer)
+    read_fd, write_fd = os.pipe()
+    chunks = []
+
+    def read_all():
+        with open(read_fd, "rb") as r:
+            for chunk in iter(lambda: r.read(65536), b""):
+                chunks.append(chunk)
+
+    reader = threading.Thread(target=read_all, daemon=True)
+    reader.start()
+    with open(write_fd, "wb") as f:
+        assert isinstance(f, io.BufferedWriter)
+        assert not f.seekable()
+        write_threaded(make_converter(tmp_path / "pipe.vct"), f)
+    # 写端的文件描述符全部关闭后读线程才能读到 EOF
+    reader.join(timeout=60)
+    assert not reader.is_alive()
+    assert strip_timestamp(b"".join(chunks)) == reference_output
+
+
+def test_vct_writer_fd_closed_on_error(tmp_path, monkeypatch):
+    # 复制出来的文件描述符在出错时也要关闭
+    dup_fds = []
+    real_dup = os.dup
+
+    def recording_dup(fd):
+        new_fd = real_dup(fd)
+        dup_fds.append(new_fd)
+        return new_fd
+
+    def failing_lseek(fd, pos, how):
+        raise OSError(errno.ESPIPE, "Illegal seek")
+
+    monkeypatch.setattr(vct_stream.os, "dup", recording_dup)
+    monkeypatch.setattr(vct_stream.os, "lseek", failing_lseek)
+    target = tmp_path / "file.vct"
+    converter = make_converter(target)
+    with open(target, "wb") as f:
+        assert converter._emit_preamble(f, None)
+        with pytest.raises(OSError) as excinfo:
+            converter.generate_vct_vector_section(f)
+    assert excinfo.value.errno == errno.ESPIPE
+    assert len(dup_fds) == 1
+    with pytest.raises(OSError):
+        os.fstat(dup_fds[0])
+
+
+def test_vct_convert_matches_serial(tmp_path, reference_output):
+    target = tmp_path / "convert.vct"
+    assert make_converter(target).convert() == 0
+    assert strip_timestamp(target.read_bytes()) == reference_output
+    with open(get_golden_file("utc_010_bypass.vct"), "rb") as f:
+        assert strip_timestamp(target.read_bytes()) == strip_timestamp(f.read())
+
+
+def test_vct_convert_gzip_target(tmp_path):
+    # .gz 目标边生成边压缩，解压后应与普通文本输出一致
+    plain = tmp_path / "plain.vct"
+    packed = tmp_path / "packed.vct.gz"
+    assert make_converter(plain).convert() == 0
+    assert make_converter(packed).convert() == 0
+    data = packed.read_bytes()
+    assert data[:2] == b"\x1f\x8b"
+    assert strip_timestamp(gzip.decompress(data)) == strip_timestamp(plain.read_bytes())
+
+
+def test_vct_writer_error_from_fd_writer(tmp_path, small_chunks, monkeypatch):
+    calls = []
+
+    def failing_fd_writer(fd):
+        def write(chunk):
+            calls.append(len(chunk))
+            if len(calls) >= 3:
+                raise OSError(errno.ENOSPC, "No space left on device")
+        return write
+
+    monkeypatch.setattr(vct_stream, "_make_fd_writer", failing_fd_writer)
+    converter = make_converter(tmp_path / "full.vct")
+    with pytest.raises(OSError) as excinfo:
+        converter.convert()
+    assert excinfo.value.errno == errno.ENOSPC
+    assert len(calls) >= 3
+    assert converter.output_file is None
+
+
+class FailingBytesIO(io.BytesIO):
+    """armed 之后 write 抛出 OSError 的内存文件"""
+
+    armed = False
+
+    def write(self, data):
+        if self.armed:
+            raise OSError(errno.EIO, "I/O error")
+        return super().write(data)
+
+
+def test_vct_writer_error_from_file_object(tmp_path, small_chunks):
+    converter = make_converter(tmp_path / "mem.vct")
+    f = FailingBytesIO()
+    assert converter._emit_preamble(f, None)
+    f.armed = True
+    with pytest.raises(OSError) as excinfo:
+        converter.generate_vct_vector_section(f)
+    assert excinfo.value.errno == errno.EIO